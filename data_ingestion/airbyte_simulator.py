@@ -0,0 +1,379 @@
+"""
+In-process stand-in for the Airbyte API, for load-testing the ingestion client.
+Implements the endpoints AirbyteClient calls (applications/token, workspaces,
+sources, destinations, connections, sources/discover, jobs and the config API's
+jobs/get) on a threaded HTTP server, with configurable:
+
+- latency: base + exponentially distributed jitter per call (discovery separately)
+- token expiry: access tokens are rejected with 401 after token_lifetime seconds
+- pagination: list calls return at most max_page_size items and a `next` link
+- 409s: creating a job for a connection with a running job, plus conflict_rate
+  of job creations that find a job started by someone else
+- 5xx: error_rate of API calls fail with 500/502/503; for creates and patches
+  half of them fail after the change was applied (outcome unknown to the client)
+
+    with AirbyteSimulator(latency=0.02, error_rate=0.05) as simulator:
+        client = AirbyteClient(simulator.url, client_id="load", client_secret="test")
+
+The discovered catalog has one stream per table of the dvd_rental dump.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from dump_loader import build_table_map
+
+
+WORKSPACE_ID = "00000000-0000-4000-8000-000000000000"
+
+DEFAULT_PAGE_SIZE = 20
+SERVER_ERRORS = (500, 502, 503)
+
+# Postgres column type -> JSON schema type of the discovered streams
+JSON_TYPES = {"integer": "integer", "smallint": "integer", "bigint": "integer", "numeric": "number",
+              "boolean": "boolean"}
+
+LIST_RESOURCES = {
+    "sources": "sourceId",
+    "destinations": "destinationId",
+    "connections": "connectionId",
+}
+
+
+def build_catalog() -> Dict:
+    """Discover response with one stream per dump table (first column as primary key)."""
+    streams = []
+    for table in sorted(build_table_map(), key=lambda t: t["table"]):
+        properties = {
+            column["name"]: {"type": JSON_TYPES.get(column["type"].split("(")[0], "string")}
+            for column in table["columns"]
+        }
+        streams.append({
+            "name": table["table"],
+            "namespace": "public",
+            "jsonSchema": {"type": "object", "properties": properties},
+            "supportedSyncModes": ["full_refresh", "incremental"],
+            "sourceDefinedPrimaryKey": [[table["columns"][0]["name"]]],
+        })
+    return {"catalog": {"streams": streams}}
+
+
+class SimulatedError(Exception):
+    """An HTTP error response (status, message) raised by a route."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AirbyteSimulator:
+    """Threaded HTTP server emulating the Airbyte API with latency and fault injection."""
+
+    def __init__(self, latency: float = 0.01, jitter: float = 0.01, discover_latency: float = 0.2,
+                 token_lifetime: float = 180, max_page_size: int = DEFAULT_PAGE_SIZE,
+                 error_rate: float = 0.0, conflict_rate: float = 0.0, job_seconds: float = 1.0,
+                 seed: Optional[int] = None, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.discover_latency = discover_latency
+        self.token_lifetime = token_lifetime
+        self.max_page_size = max_page_size
+        self.error_rate = error_rate
+        self.conflict_rate = conflict_rate
+        self.job_seconds = job_seconds
+        self.random = random.Random(seed)
+
+        self.catalog = build_catalog()
+        self.resources: Dict[str, Dict[str, Dict]] = {name: {} for name in LIST_RESOURCES}
+        self.jobs: Dict[int, Dict] = {}
+        self.tokens: Dict[str, float] = {}
+        self.stats: Dict[str, int] = {"requests": 0, "injected_5xx": 0, "conflicts": 0, "expired_tokens": 0,
+                                      "tokens_issued": 0}
+        self._lock = threading.Lock()
+
+        handler = type("Handler", (_Handler,), {"simulator": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to AirbyteClient (switches to /api/public after authentication)."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self) -> "AirbyteSimulator":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="airbyte-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "AirbyteSimulator":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # -----------------------------------------------------------------------
+    # Request handling
+    # -----------------------------------------------------------------------
+
+    def _chance(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self.random.random() < rate
+
+    def _delay(self, base: float) -> None:
+        with self._lock:
+            jitter = self.random.expovariate(1 / self.jitter) if self.jitter > 0 else 0.0
+        time.sleep(base + jitter)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def handle(self, method: str, url: str, headers, body: Optional[Dict]) -> Tuple[int, Dict]:
+        """Route one request; returns (status, JSON body)."""
+        parsed = urlparse(url)
+        path = parsed.path
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        self._count("requests")
+        self._delay(self.discover_latency if path.endswith("/discover") else self.latency)
+
+        try:
+            if path == "/api/v1/applications/token" and method == "POST":
+                return 200, self._issue_token(body or {})
+            self._check_token(headers.get("Authorization", ""))
+
+            write = method in ("POST", "PATCH") and not path.endswith(("/discover", "/list", "/jobs/get"))
+            fail_after = False
+            if self._chance(self.error_rate):
+                self._count("injected_5xx")
+                if write and self._chance(0.5):
+                    fail_after = True
+                else:
+                    return self.random.choice(SERVER_ERRORS), {"message": "Injected server error"}
+
+            status, payload = self._route(method, path, query, body or {}, headers.get("Host", ""))
+            if fail_after and status < 400:
+                return self.random.choice(SERVER_ERRORS), {"message": "Injected server error (applied)"}
+            return status, payload
+        except SimulatedError as e:
+            return e.status, {"message": str(e)}
+
+    def _issue_token(self, body: Dict) -> Dict:
+        if not body.get("client_id") or not body.get("client_secret"):
+            raise SimulatedError(401, "Invalid client credentials")
+        token = uuid.uuid4().hex
+        with self._lock:
+            self.tokens[token] = time.monotonic() + self.token_lifetime
+            self.stats["tokens_issued"] += 1
+        return {"access_token": token, "token_type": "Bearer", "expires_in": self.token_lifetime}
+
+    def _check_token(self, authorization: str) -> None:
+        token = authorization.removeprefix("Bearer ")
+        with self._lock:
+            expires_at = self.tokens.get(token)
+        if expires_at is None:
+            raise SimulatedError(401, "Missing or unknown access token")
+        if time.monotonic() >= expires_at:
+            self._count("expired_tokens")
+            raise SimulatedError(401, "Access token expired")
+
+    def _route(self, method: str, path: str, query: Dict, body: Dict, host: str) -> Tuple[int, Dict]:
+        parts = path.removeprefix("/api/public").removeprefix("/api").strip("/").split("/")
+        if parts[0] != "v1" or len(parts) < 2:
+            raise SimulatedError(404, f"Unknown endpoint {path}")
+        resource, rest = parts[1], parts[2:]
+
+        if resource == "workspaces":
+            workspaces = [{"workspaceId": WORKSPACE_ID, "name": "Simulated workspace"}]
+            return 200, ({"workspaces": workspaces} if rest == ["list"] else {"data": workspaces})
+
+        if resource == "sources" and rest == ["discover"] and method == "POST":
+            if body.get("sourceId") not in self.resources["sources"]:
+                raise SimulatedError(404, f"Source {body.get('sourceId')} not found")
+            return 200, self.catalog
+
+        if resource in LIST_RESOURCES:
+            if not rest and method == "GET":
+                return 200, self._list(resource, path, query, host)
+            if not rest and method == "POST":
+                return 200, self._create(resource, body)
+            if len(rest) == 1 and method in ("GET", "PATCH"):
+                with self._lock:
+                    item = self.resources[resource].get(rest[0])
+                    if item is None:
+                        raise SimulatedError(404, f"{resource[:-1]} {rest[0]} not found")
+                    if method == "PATCH":
+                        item.update(body)
+                    return 200, dict(item)
+
+        if resource == "jobs":
+            if rest == ["get"] and method == "POST":
+                return 200, self._job_attempts(int(body.get("id", 0)))
+            if not rest and method == "POST":
+                return 200, self._create_job(body.get("connectionId"))
+            if not rest and method == "GET":
+                return 200, self._list_jobs(query)
+            if len(rest) == 1 and method == "GET":
+                return 200, self._job_status(int(rest[0]))
+
+        raise SimulatedError(404, f"Unknown endpoint {method} {path}")
+
+    # -----------------------------------------------------------------------
+    # Resources
+    # -----------------------------------------------------------------------
+
+    def _list(self, resource: str, path: str, query: Dict, host: str) -> Dict:
+        limit = min(int(query.get("limit", self.max_page_size)), self.max_page_size)
+        offset = int(query.get("offset", 0))
+        with self._lock:
+            items = list(self.resources[resource].values())
+        page = items[offset:offset + limit]
+        body = {"data": page}
+        if offset + limit < len(items):
+            params = {**query, "limit": limit, "offset": offset + limit}
+            body["next"] = f"http://{host}{path}?{urlencode(params)}"
+        return body
+
+    def _create(self, resource: str, body: Dict) -> Dict:
+        id_field = LIST_RESOURCES[resource]
+        item = {id_field: str(uuid.uuid4()), "workspaceId": body.get("workspaceId", WORKSPACE_ID), **body}
+        if resource == "sources":
+            item.setdefault("sourceType", "postgres")
+        elif resource == "destinations":
+            item.setdefault("destinationType", "databricks")
+        with self._lock:
+            self.resources[resource][item[id_field]] = item
+        return dict(item)
+
+    # -----------------------------------------------------------------------
+    # Jobs
+    # -----------------------------------------------------------------------
+
+    def _job_state(self, job: Dict) -> Dict:
+        """Job payload with its status and progress at this moment."""
+        elapsed = time.monotonic() - job["started"]
+        done = min(1.0, elapsed / self.job_seconds) if self.job_seconds > 0 else 1.0
+        rows = sum(stream["records"] for stream in job["streams"])
+        return {
+            "jobId": job["jobId"],
+            "jobType": "sync",
+            "connectionId": job["connectionId"],
+            "status": "succeeded" if done >= 1.0 else "running",
+            "startTime": job["startTime"],
+            "duration": f"PT{min(elapsed, self.job_seconds):.0f}S",
+            "rowsSynced": int(rows * done),
+            "bytesSynced": int(rows * done * 120),
+        }
+
+    def _running_job(self, connection_id: str) -> Optional[Dict]:
+        for job in self.jobs.values():
+            if job["connectionId"] == connection_id and self._job_state(job)["status"] == "running":
+                return job
+        return None
+
+    def _start_job(self, connection: Dict) -> Dict:
+        streams = (connection.get("configurations") or {}).get("streams", [])
+        job = {
+            "jobId": len(self.jobs) + 1,
+            "connectionId": connection["connectionId"],
+            "started": time.monotonic(),
+            "startTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "streams": [
+                {"name": stream.get("stream", {}).get("name") or stream.get("name"),
+                 "records": self.random.randint(0, 20000)}
+                for stream in streams
+            ],
+        }
+        self.jobs[job["jobId"]] = job
+        return job
+
+    def _create_job(self, connection_id: Optional[str]) -> Dict:
+        conflict = self._chance(self.conflict_rate)
+        with self._lock:
+            connection = self.resources["connections"].get(connection_id)
+            if connection is None:
+                raise SimulatedError(404, f"Connection {connection_id} not found")
+            if self._running_job(connection_id) is None:
+                job = self._start_job(connection)
+                if not conflict:
+                    return self._job_state(job)
+                # Someone else triggered the same connection first
+            self.stats["conflicts"] += 1
+        raise SimulatedError(409, "A sync is already running for this connection")
+
+    def _list_jobs(self, query: Dict) -> Dict:
+        with self._lock:
+            jobs = [self._job_state(job) for job in self.jobs.values()
+                    if not query.get("connectionId") or job["connectionId"] == query["connectionId"]]
+        if query.get("status"):
+            jobs = [job for job in jobs if job["status"] == query["status"]]
+        jobs.sort(key=lambda job: job["jobId"], reverse=True)
+        return {"data": jobs[:int(query.get("limit", 20))]}
+
+    def _job_status(self, job_id: int) -> Dict:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise SimulatedError(404, f"Job {job_id} not found")
+            return self._job_state(job)
+
+    def _job_attempts(self, job_id: int) -> Dict:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                raise SimulatedError(404, f"Job {job_id} not found")
+            stream_stats = [
+                {"streamName": stream["name"],
+                 "stats": {"recordsEmitted": stream["records"], "bytesEmitted": stream["records"] * 120}}
+                for stream in job["streams"]
+            ]
+        return {"job": {"id": job_id}, "attempts": [{"attempt": {"streamStats": stream_stats}}]}
+
+    def summary(self) -> Dict:
+        """Server-side counters plus the number of resources and jobs created."""
+        with self._lock:
+            return {
+                **self.stats,
+                **{resource: len(items) for resource, items in self.resources.items()},
+                "jobs": len(self.jobs),
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Translates HTTP requests to AirbyteSimulator.handle calls."""
+
+    simulator: AirbyteSimulator = None
+    # Keep-alive, so pooled client connections are reused as with a real server
+    protocol_version = "HTTP/1.1"
+
+    def _serve(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+        status, payload = self.simulator.handle(self.command, self.path, self.headers, body)
+
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = _serve
+
+    def log_message(self, format, *args) -> None:
+        """Silence per-request logging."""
@@ -0,0 +1,276 @@
+"""
+Asyncio client for the Airbyte API.
+Provisions or triggers many connections (e.g. one dvd_rental connection per tenant)
+concurrently, over a bounded connection pool and with a single shared access token.
+Calls go through transport.RetryingSession (timeouts, retries, circuit breaker) and
+creates through create_with_retry, like AirbyteClient.
+
+    async with AsyncAirbyteClient(url, client_id=..., client_secret=...) as client:
+        await client.authenticate()
+        jobs = await client.trigger_syncs(connection_ids)
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from requests.adapters import HTTPAdapter
+
+from http_metrics import instrument_from_env
+from resource_index import iter_resources
+from setup_airbyte import (
+    build_configured_streams,
+    build_connection_config,
+    build_databricks_destination_config,
+    build_postgres_source_config,
+    parse_discovered_catalog,
+)
+from token_manager import BearerTokenAuth, TokenManager
+from transport import RetryingSession, create_with_retry
+
+
+class AsyncAirbyteClient:
+    """
+    Async counterpart of AirbyteClient with the same surface.
+    Requests run on a pooled requests.Session in a worker pool sized to the concurrency
+    limit, so at most max_concurrency calls are in flight and connections are reused.
+    """
+
+    def __init__(self, base_url: str, api_key: str = None, workspace_id: str = None,
+                 client_id: str = None, client_secret: str = None,
+                 max_connections: int = 10, max_concurrency: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.workspace_id = workspace_id
+        self.max_concurrency = max_concurrency
+
+        # Bounded connection pool shared by all in-flight requests, with timeouts,
+        # retries with backoff and a circuit breaker on every call
+        self.session = RetryingSession()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.metrics = instrument_from_env(self.session)
+
+        # One token for all concurrent callers; refreshed once when close to expiry
+        self.token_manager = None
+        if client_id and client_secret:
+            self.token_manager = TokenManager(
+                f"{self.base_url.replace('/api/public', '/api')}/v1/applications/token",
+                client_id,
+                client_secret,
+                session=self.session
+            )
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="airbyte")
+        self._semaphore = None
+
+    async def __aenter__(self) -> "AsyncAirbyteClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the worker pool and pooled connections."""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking call in the worker pool, bounded by the concurrency limit."""
+        if self._semaphore is None:
+            # Created lazily so it binds to the running event loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict:
+        """Send an API request and return the decoded JSON body."""
+        response = await self._run(self.session.request, method, f"{self.base_url}{path}", **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    async def _create(self, path: str, find_existing, body: Dict) -> Dict:
+        """POST a create call; a failed attempt is only re-sent if find_existing() finds nothing."""
+        return await self._run(
+            create_with_retry, self.session, f"{self.base_url}{path}", find_existing, json=body
+        )
+
+    def get_headers(self) -> Dict[str, str]:
+        """Per-call headers (none: content type and auth are set on the session), for iter_resources."""
+        return {}
+
+    def _find_created(self, resource: str, **match) -> Optional[Dict]:
+        """Find a resource whose fields equal `match` (used to check whether a failed create was applied)."""
+        for item in iter_resources(self, resource):
+            if all(item.get(key) == value for key, value in match.items()):
+                return item
+        return None
+
+    def _find_running_job(self, connection_id: str) -> Optional[Dict]:
+        """The running job of a connection in the shape returned by the create job call."""
+        response = self.session.get(
+            f"{self.base_url}/v1/jobs",
+            params={"connectionId": connection_id, "status": "running", "limit": 1}
+        )
+        response.raise_for_status()
+        jobs = response.json().get("data", [])
+        return {"jobId": str(jobs[0]["jobId"])} if jobs else None
+
+    async def authenticate(self) -> None:
+        """Authenticate with Airbyte API using Client Credentials or Access Token."""
+        if self.token_manager:
+            token = await self._run(self.token_manager.get_token)
+            if not token:
+                raise Exception("Failed to get access token from client credentials")
+            self.session.auth = BearerTokenAuth(self.token_manager)
+            method = "Client Credentials"
+        elif self.api_key:
+            self.session.headers.update({"Authorization": f"Bearer {self.api_key}"})
+            method = "Access Token"
+        else:
+            raise Exception("No authentication method provided. Please provide either API key or client credentials.")
+
+        # Public API uses /api/public/v1
+        if "/api/public" not in self.base_url:
+            self.base_url = self.base_url.replace("/api", "/api/public")
+
+        # Verify by listing workspaces
+        workspaces = (await self._request("GET", "/v1/workspaces")).get("data", [])
+        if workspaces and not self.workspace_id:
+            self.workspace_id = workspaces[0]["workspaceId"]
+        print(f"✓ Authenticated with Airbyte API using {method}")
+
+    async def get_workspace(self, workspace_id: Optional[str] = None) -> str:
+        """Get the workspace ID. If provided, use it; otherwise fetch the first one."""
+        if workspace_id:
+            self.workspace_id = workspace_id
+            return self.workspace_id
+
+        if self.workspace_id:
+            return self.workspace_id
+
+        workspaces = (await self._request("GET", "/v1/workspaces")).get("data", [])
+        if not workspaces:
+            raise Exception("No workspaces found")
+
+        self.workspace_id = workspaces[0]["workspaceId"]
+        print(f"✓ Using workspace: {self.workspace_id}")
+        return self.workspace_id
+
+    async def create_postgres_source(self, name: str = "dvd_rental", workspace_id: Optional[str] = None,
+                                     replication_method: str = "Standard") -> str:
+        """Create PostgreSQL source connector."""
+        result = await self._create(
+            "/v1/sources",
+            lambda: self._find_created("sources", name=name),
+            build_postgres_source_config(
+                workspace_id or self.workspace_id, name=name, replication_method=replication_method
+            )
+        )
+        source_id = result.get("sourceId") or result.get("id")
+        print(f"✓ Created PostgreSQL source {name}: {source_id}")
+        return source_id
+
+    async def create_databricks_destination(
+        self,
+        host: str,
+        http_path: str,
+        token: str,
+        catalog: str,
+        schema: str,
+        name: str = "Databricks",
+        workspace_id: Optional[str] = None
+    ) -> str:
+        """Create Databricks destination connector."""
+        result = await self._create(
+            "/v1/destinations",
+            lambda: self._find_created("destinations", name=name),
+            build_databricks_destination_config(
+                workspace_id or self.workspace_id, host, http_path, token, catalog, schema, name=name
+            )
+        )
+        destination_id = result.get("destinationId") or result.get("id")
+        print(f"✓ Created Databricks destination {name}: {destination_id}")
+        return destination_id
+
+    async def get_source_schema(self, source_id: str) -> Dict:
+        """Discover schema from source."""
+        result = await self._request(
+            "POST", "/v1/sources/discover",
+            json={
+                "sourceId": source_id,
+                "disable_cache": False
+            },
+            idempotent=True
+        )
+        catalog = parse_discovered_catalog(result)
+        print(f"✓ Discovered {len(catalog['streams'])} tables for source {source_id}")
+        return catalog
+
+    async def create_connection_with_streams(
+        self,
+        source_id: str,
+        destination_id: str,
+        catalog: Dict,
+        primary_keys: Dict[str, List[str]] = None,
+        cursor_fields: Dict[str, str] = None,
+        name: str = "dvd_rental → Databricks"
+    ) -> str:
+        """Create connection between source and destination with configured streams."""
+        configured_streams = build_configured_streams(catalog, primary_keys, cursor_fields)
+        result = await self._create(
+            "/v1/connections",
+            lambda: self._find_created("connections", name=name, sourceId=source_id, destinationId=destination_id),
+            build_connection_config(source_id, destination_id, configured_streams, name=name)
+        )
+        connection_id = result.get("connectionId") or result.get("id")
+        print(f"✓ Created connection {name} with {len(configured_streams)} streams: {connection_id}")
+        return connection_id
+
+    async def update_connection_streams(
+        self,
+        connection_id: str,
+        catalog: Dict,
+        primary_keys: Dict[str, List[str]] = None,
+        cursor_fields: Dict[str, str] = None
+    ) -> None:
+        """Update an existing connection with configured streams."""
+        configured_streams = build_configured_streams(catalog, primary_keys, cursor_fields)
+        # The full stream configuration is sent, so repeating the patch is harmless
+        await self._request(
+            "PATCH", f"/v1/connections/{connection_id}",
+            json={"configurations": {"streams": configured_streams}},
+            idempotent=True
+        )
+        print(f"✓ Updated connection with {len(configured_streams)} streams: {connection_id}")
+
+    async def trigger_sync(self, connection_id: str) -> str:
+        """Trigger a manual sync for the connection using the Jobs API."""
+        # A sync that is already running was probably started by a failed attempt
+        result = await self._create(
+            "/v1/jobs",
+            lambda: self._find_running_job(connection_id),
+            {
+                "connectionId": connection_id,
+                "jobType": "sync"
+            }
+        )
+        job_id = result.get("jobId") or result.get("job", {}).get("id")
+        print(f"✓ Triggered sync job for {connection_id}: {job_id}")
+        return job_id
+
+    async def trigger_syncs(self, connection_ids: List[str]) -> Dict[str, object]:
+        """
+        Trigger syncs for many connections in parallel.
+        Returns a mapping of connection ID to job ID, or to the exception raised for it.
+        """
+        results = await asyncio.gather(
+            *(self.trigger_sync(connection_id) for connection_id in connection_ids),
+            return_exceptions=True
+        )
+        return dict(zip(connection_ids, results))
@@ -0,0 +1,83 @@
+"""
+Local cache for discovered Airbyte source catalogs.
+Schema discovery starts a connector against the source database and is the slowest
+step of setup, so discovered catalogs are kept on disk keyed by source ID and a hash
+of the source configuration, and reused until they expire or are invalidated.
+
+The configuration is the one the API returns, where secrets are masked, so a
+changed password alone does not invalidate a catalog; run setup with
+--refresh-catalog after rotating a secret that changes what the source can read.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_DIR = Path(
+    os.getenv("AIRBYTE_CATALOG_CACHE_DIR", Path.home() / ".cache" / "elt-project" / "airbyte_catalogs")
+).expanduser()
+
+# Cached catalogs expire after a day unless overridden (seconds)
+DEFAULT_TTL = int(os.getenv("AIRBYTE_CATALOG_CACHE_TTL", 24 * 60 * 60))
+
+
+def config_hash(configuration: Dict) -> str:
+    """Stable hash of a source configuration."""
+    payload = json.dumps(configuration or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CatalogCache:
+    """On-disk catalog cache with one JSON file per source."""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, ttl: int = DEFAULT_TTL):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+
+    def _path(self, source_id: str) -> Path:
+        return self.cache_dir / f"{source_id}.json"
+
+    def get(self, source_id: str, configuration: Dict) -> Optional[Dict]:
+        """Return the cached catalog, or None if missing, expired or discovered with another configuration."""
+        try:
+            entry = json.loads(self._path(source_id).read_text())
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("config_hash") != config_hash(configuration):
+            return None
+        if time.time() - entry.get("discovered_at", 0) > self.ttl:
+            return None
+        return entry.get("catalog")
+
+    def put(self, source_id: str, configuration: Dict, catalog: Dict) -> None:
+        """Store a discovered catalog (written atomically so readers never see a partial file)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "source_id": source_id,
+            "config_hash": config_hash(configuration),
+            "discovered_at": time.time(),
+            "catalog": catalog,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(source_id))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def invalidate(self, source_id: Optional[str] = None) -> None:
+        """Drop the cached catalog for one source, or for all sources."""
+        paths = [self._path(source_id)] if source_id else self.cache_dir.glob("*.json")
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
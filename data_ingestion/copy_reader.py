@@ -0,0 +1,197 @@
+"""
+Memory-mapped reader for PostgreSQL COPY text segments (the .dat files of the dump).
+Row and field boundaries are found with vectorised NumPy scans over the mapped file,
+and each column is assembled into an Arrow array and cast to its type in one call,
+so no Python object is created per row. Only fields containing backslash escapes
+(and bytea values) are decoded individually.
+
+A file can be split into line-aligned byte ranges so that one table is parsed by
+several processes:
+
+    ranges = split_ranges(path, 4)
+    readers = [CopyReader(path, table, start, end) for start, end in ranges]
+"""
+
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from dump_loader import arrow_type, decode_field, schema_for
+
+
+# Bytes scanned per batch; bounds memory independently of the file size
+DEFAULT_BATCH_BYTES = 16 * 1024 * 1024
+
+TAB, NEWLINE, BACKSLASH = ord("\t"), ord("\n"), ord("\\")
+END_OF_DATA = b"\\.\n"
+
+
+def data_end(mm: mmap.mmap) -> int:
+    """Offset where the row data ends (before the \\. end-of-data marker, if present)."""
+    if mm[:len(END_OF_DATA)] == END_OF_DATA:
+        return 0
+    marker = mm.rfind(b"\n" + END_OF_DATA)
+    return marker + 1 if marker >= 0 else len(mm)
+
+
+def split_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a segment into up to `parts` byte ranges that start and end on row boundaries."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = data_end(mm)
+            bounds = [0]
+            for i in range(1, parts):
+                cut = mm.find(b"\n", end * i // parts)
+                if cut < 0 or cut + 1 >= end:
+                    break
+                if cut + 1 > bounds[-1]:
+                    bounds.append(cut + 1)
+            bounds.append(end)
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+class CopyReader:
+    """
+    Iterate a COPY text segment (or a byte range of it) as Arrow record batches.
+    `table` is an entry of dump_loader.build_table_map(); `start` must be 0 or a row
+    boundary (see split_ranges). Use batch.column(i).to_numpy() for NumPy buffers.
+    """
+
+    def __init__(self, path: str, table: Dict, start: int = 0, end: Optional[int] = None,
+                 batch_bytes: int = DEFAULT_BATCH_BYTES):
+        self.path = path
+        self.table = table
+        self.schema = schema_for(table)
+        self.width = len(table["columns"])
+        self.start = start
+        self.end = end
+        self.batch_bytes = batch_bytes
+
+    def __iter__(self) -> Iterator[pa.RecordBatch]:
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                buf = np.frombuffer(mm, dtype=np.uint8)
+                try:
+                    end = min(self.end if self.end is not None else len(mm), data_end(mm))
+                    position = self.start
+                    while position < end:
+                        # Batches end on a row boundary
+                        stop = min(end, position + self.batch_bytes)
+                        if stop < end:
+                            newline = mm.rfind(b"\n", position, stop)
+                            if newline < 0:
+                                # A single row longer than batch_bytes
+                                newline = mm.find(b"\n", stop, end)
+                            stop = newline + 1 if newline >= 0 else end
+                        yield self._parse(buf[position:stop])
+                        position = stop
+                finally:
+                    # Release the buffer export so the mmap can be closed
+                    del buf
+
+    def read_all(self) -> pa.Table:
+        """Read the whole range into one table."""
+        return pa.Table.from_batches(list(self), schema=self.schema)
+
+    def _parse(self, block: np.ndarray) -> pa.RecordBatch:
+        """Parse one block of whole rows."""
+        if block[-1] != NEWLINE:
+            block = np.append(block, np.uint8(NEWLINE))
+        # Blocks are at most batch_bytes long, so 32-bit offsets suffice
+        delimiters = np.flatnonzero((block == TAB) | (block == NEWLINE)).astype(np.int32)
+        rows = int(np.count_nonzero(block[delimiters] == NEWLINE))
+        if len(delimiters) != rows * self.width:
+            raise Exception(
+                f"{self.table['table']}: expected {self.width} fields per row in "
+                f"{self.path}, found {len(delimiters)} delimiters for {rows} rows"
+            )
+
+        starts = np.empty_like(delimiters)
+        starts[0] = 0
+        starts[1:] = delimiters[:-1] + 1
+
+        # Backslashes are rare: map each one to the field it falls in
+        escaped = np.zeros(len(delimiters), dtype=bool)
+        escaped[np.searchsorted(delimiters, np.flatnonzero(block == BACKSLASH))] = True
+
+        # Column-major copies keep the per-column work on contiguous arrays
+        starts = np.ascontiguousarray(starts.reshape(rows, self.width).T)
+        ends = np.ascontiguousarray(delimiters.reshape(rows, self.width).T)
+        escaped = escaped.reshape(rows, self.width).T
+
+        arrays = [
+            self._column(block, starts[i], ends[i], escaped[i], column)
+            for i, column in enumerate(self.table["columns"])
+        ]
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    def _column(self, block: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                has_backslash: np.ndarray, column: Dict) -> pa.Array:
+        """Build one typed column from field offsets."""
+        lengths = ends - starts
+        nulls = has_backslash & (lengths == 2) & (block[np.minimum(starts + 1, len(block) - 1)] == ord("N"))
+        escaped = np.flatnonzero(has_backslash & ~nulls)
+        lengths = np.where(nulls, 0, lengths)
+
+        # Gather the field bytes into one contiguous Arrow string buffer
+        offsets = np.zeros(len(starts) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=offsets[1:])
+        total = int(offsets[-1])
+        gather = np.repeat(starts - offsets[:-1], lengths)
+        gather += np.arange(total, dtype=np.int32)
+        data = block[gather]
+
+        null_count = int(np.count_nonzero(nulls))
+        validity = pa.py_buffer(np.packbits(~nulls, bitorder="little")) if null_count else None
+        strings = pa.Array.from_buffers(
+            pa.string(), len(starts),
+            [validity, pa.py_buffer(offsets), pa.py_buffer(data)],
+            null_count=null_count,
+        )
+
+        target = arrow_type(column["type"])
+        if pa.types.is_binary(target):
+            # bytea is dumped as escaped hex (\\x...); decoded per value
+            values = [
+                None if nulls[i] else
+                bytes.fromhex(decode_field(bytes(block[starts[i]:ends[i]]).decode("utf-8"))[2:])
+                for i in range(len(starts))
+            ]
+            return pa.array(values, type=target)
+
+        if len(escaped):
+            decoded = pa.array(
+                [decode_field(bytes(block[starts[i]:ends[i]]).decode("utf-8")) for i in escaped],
+                type=pa.string(),
+            )
+            mask = np.zeros(len(starts), dtype=bool)
+            mask[escaped] = True
+            strings = pc.replace_with_mask(strings, pa.array(mask), decoded)
+
+        if pa.types.is_string(target):
+            return strings
+        if pa.types.is_boolean(target):
+            return pc.equal(strings, "t")
+        return pc.cast(strings, target)
+
+
+def _read_range(path: str, table: Dict, start: int, end: int) -> pa.Table:
+    return CopyReader(path, table, start, end).read_all()
+
+
+def read_parallel(table: Dict, parts: int, max_workers: Optional[int] = None) -> Iterator[pa.Table]:
+    """Parse one table across several processes; yields one table per byte range, in file order."""
+    ranges = split_ranges(table["path"], parts)
+    with ProcessPoolExecutor(max_workers=max_workers or len(ranges) or 1) as pool:
+        futures = [pool.submit(_read_range, table["path"], table, start, end) for start, end in ranges]
+        for future in futures:
+            yield future.result()
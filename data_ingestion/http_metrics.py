@@ -0,0 +1,231 @@
+"""
+HTTP instrumentation for the Airbyte clients.
+A response hook on the client's requests.Session records per-endpoint call counts,
+status codes, bytes and latency. Token refreshes and schema discovery are also
+totalled separately. At process exit the metrics are written as a JSON summary and,
+optionally, in Prometheus text exposition format.
+
+Enable by setting AIRBYTE_METRICS_JSON and/or AIRBYTE_METRICS_PROM to an output path
+("-" writes the JSON summary to stdout).
+"""
+
+import atexit
+import bisect
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Latency samples kept per endpoint for percentiles (reservoir sampled beyond this)
+MAX_SAMPLES = 10000
+
+_ID_SEGMENT = re.compile(r"^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+)$", re.IGNORECASE)
+
+
+def endpoint_template(url: str) -> str:
+    """Normalize a request URL to an endpoint template, e.g. /v1/connections/{id}."""
+    path = urlparse(url).path
+    if "/v1/" in path:
+        path = path[path.index("/v1/"):]
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def endpoint_category(endpoint: str) -> str:
+    """Group endpoints into the phases we want timed separately."""
+    if endpoint.endswith("/applications/token"):
+        return "auth"
+    if endpoint.endswith("/discover"):
+        return "discovery"
+    if endpoint.startswith("/v1/jobs"):
+        return "jobs"
+    return "api"
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class EndpointStats:
+    """Counters and latency distribution for one (method, endpoint)."""
+
+    def __init__(self):
+        self.count = 0
+        self.statuses: Dict[int, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.samples: List[float] = []
+
+    def record(self, status: int, bytes_sent: int, bytes_received: int, latency: float) -> None:
+        self.count += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+        self.latency_sum += latency
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(latency)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = latency
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.samples)
+        return {
+            "count": self.count,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_seconds": {
+                "total": round(self.latency_sum, 6),
+                "mean": round(self.latency_sum / self.count, 6) if self.count else 0.0,
+                "p50": round(percentile(latencies, 50), 6),
+                "p90": round(percentile(latencies, 90), 6),
+                "p99": round(percentile(latencies, 99), 6),
+                "max": round(latencies[-1], 6) if latencies else 0.0,
+            },
+        }
+
+
+class HttpMetrics:
+    """Thread-safe HTTP metrics registry shared by every instrumented session."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.endpoints: Dict[tuple, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, endpoint: str, status: int, bytes_sent: int,
+               bytes_received: int, latency: float) -> None:
+        with self._lock:
+            stats = self.endpoints.setdefault((method, endpoint), EndpointStats())
+            stats.record(status, bytes_sent, bytes_received, latency)
+
+    def response_hook(self, response: requests.Response, **kwargs) -> requests.Response:
+        """requests response hook recording one finished call."""
+        request = response.request
+        body = request.body or b""
+        self.record(
+            request.method,
+            endpoint_template(request.url),
+            response.status_code,
+            len(body.encode("utf-8") if isinstance(body, str) else body),
+            len(response.content or b""),
+            response.elapsed.total_seconds(),
+        )
+        return response
+
+    def instrument(self, session: requests.Session) -> None:
+        """Record every response received through a session."""
+        if self.response_hook not in session.hooks["response"]:
+            session.hooks["response"].append(self.response_hook)
+
+    def summary(self) -> Dict:
+        """JSON-serialisable summary per endpoint and per category (auth, discovery, jobs, api)."""
+        with self._lock:
+            endpoints = [
+                {"method": method, "endpoint": endpoint, "category": endpoint_category(endpoint), **stats.summary()}
+                for (method, endpoint), stats in sorted(self.endpoints.items(), key=lambda item: item[0][1])
+            ]
+
+        categories: Dict[str, Dict] = {}
+        for e in endpoints:
+            totals = categories.setdefault(e["category"], {"count": 0, "latency_seconds": 0.0, "bytes_received": 0})
+            totals["count"] += e["count"]
+            totals["latency_seconds"] = round(totals["latency_seconds"] + e["latency_seconds"]["total"], 6)
+            totals["bytes_received"] += e["bytes_received"]
+
+        return {
+            "wall_seconds": round(time.time() - self.started_at, 3),
+            "requests": sum(e["count"] for e in endpoints),
+            "categories": categories,
+            "endpoints": endpoints,
+        }
+
+    def prometheus(self) -> str:
+        """Metrics in Prometheus text exposition format."""
+        lines = [
+            "# HELP airbyte_http_requests_total Airbyte API calls by endpoint and status.",
+            "# TYPE airbyte_http_requests_total counter",
+        ]
+        with self._lock:
+            items = sorted(self.endpoints.items(), key=lambda item: item[0][1])
+            for (method, endpoint), stats in items:
+                for status, n in sorted(stats.statuses.items()):
+                    lines.append(
+                        f'airbyte_http_requests_total{{method="{method}",endpoint="{endpoint}",'
+                        f'status="{status}"}} {n}'
+                    )
+
+            lines += [
+                "# HELP airbyte_http_response_bytes_total Response body bytes received by endpoint.",
+                "# TYPE airbyte_http_response_bytes_total counter",
+            ]
+            for (method, endpoint), stats in items:
+                lines.append(
+                    f'airbyte_http_response_bytes_total{{method="{method}",endpoint="{endpoint}"}} {stats.bytes_received}'
+                )
+
+            lines += [
+                "# HELP airbyte_http_request_duration_seconds Airbyte API call latency by endpoint.",
+                "# TYPE airbyte_http_request_duration_seconds histogram",
+            ]
+            for (method, endpoint), stats in items:
+                labels = f'method="{method}",endpoint="{endpoint}",category="{endpoint_category(endpoint)}"'
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), stats.buckets):
+                    cumulative += n
+                    lines.append(f'airbyte_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"airbyte_http_request_duration_seconds_sum{{{labels}}} {stats.latency_sum:.6f}")
+                lines.append(f"airbyte_http_request_duration_seconds_count{{{labels}}} {stats.count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, json_path: Optional[str] = None, prometheus_path: Optional[str] = None) -> None:
+        """Write the JSON summary and/or Prometheus text to the given paths ("-" is stdout for JSON)."""
+        if json_path:
+            payload = json.dumps(self.summary(), indent=2)
+            if json_path == "-":
+                print(payload)
+            else:
+                with open(json_path, "w") as f:
+                    f.write(payload + "\n")
+        if prometheus_path:
+            with open(prometheus_path, "w") as f:
+                f.write(self.prometheus())
+
+
+_metrics: Optional[HttpMetrics] = None
+
+
+def instrument_from_env(session: requests.Session) -> Optional[HttpMetrics]:
+    """
+    Instrument a session if AIRBYTE_METRICS_JSON or AIRBYTE_METRICS_PROM is set.
+    All sessions in the process share one registry, exported once at exit.
+    """
+    global _metrics
+    json_path = os.getenv("AIRBYTE_METRICS_JSON")
+    prometheus_path = os.getenv("AIRBYTE_METRICS_PROM")
+    if not (json_path or prometheus_path):
+        return None
+
+    if _metrics is None:
+        _metrics = HttpMetrics()
+        atexit.register(_metrics.export, json_path, prometheus_path)
+    _metrics.instrument(session)
+    return _metrics
@@ -0,0 +1,134 @@
+"""
+Wait for Airbyte sync jobs to finish.
+Polls a job with exponential backoff and jitter, reports progress, and maps the
+final job status to a process exit code so downstream steps start as soon as
+the data has landed.
+"""
+
+import random
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from setup_airbyte import AirbyteClient
+
+
+# Job statuses after which the job will not change any more
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Process exit codes for the final job status
+EXIT_CODES = {
+    "succeeded": 0,
+    "failed": 1,
+    "cancelled": 2,
+}
+EXIT_TIMEOUT = 3
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Human-readable byte count."""
+    if num_bytes < 1024:
+        return f"{int(num_bytes)} B"
+    size = float(num_bytes)
+    for unit in ("KB", "MB", "GB", "TB"):
+        size /= 1024
+        if size < 1024 or unit == "TB":
+            return f"{size:.1f} {unit}"
+
+
+def format_elapsed(seconds: float) -> str:
+    """Elapsed time as H:MM:SS."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+def next_interval(interval: float, max_interval: float, backoff: float = 2.0) -> float:
+    """Grow the poll interval exponentially up to max_interval."""
+    return min(max_interval, interval * backoff)
+
+
+def jittered(interval: float) -> float:
+    """Spread polls of concurrent waiters (equal jitter: between half and the full interval)."""
+    return interval / 2 + random.uniform(0, interval / 2)
+
+
+def wait_for_job(
+    client: AirbyteClient,
+    job_id: str,
+    timeout: float = 3600,
+    initial_interval: float = 5,
+    max_interval: float = 60,
+    label: str = ""
+) -> Dict:
+    """
+    Poll a job until it reaches a terminal status or the timeout expires.
+    The interval backs off while the job makes no progress and resets when it does.
+    Returns the last job payload; its "status" is "timeout" if the wait timed out.
+    """
+    prefix = f"[{label}] " if label else ""
+    start = time.monotonic()
+    interval = initial_interval
+    last_progress = None
+
+    while True:
+        try:
+            job = client.get_job(job_id)
+        except requests.exceptions.HTTPError as e:
+            # Transient server errors should not abort the wait
+            if e.response is None or e.response.status_code < 500:
+                raise
+            print(f"{prefix}⚠ Polling job {job_id} failed ({e.response.status_code}), retrying...")
+            job = {"status": "unknown"}
+
+        status = job.get("status", "unknown")
+        elapsed = time.monotonic() - start
+        progress = (status, job.get("rowsSynced"), job.get("bytesSynced"))
+
+        if status in TERMINAL_STATUSES:
+            return job
+
+        if progress != last_progress:
+            print(
+                f"{prefix}⟳ Job {job_id} {status}: "
+                f"{job.get('rowsSynced') or 0:,} rows, {format_bytes(job.get('bytesSynced') or 0)}, "
+                f"{format_elapsed(elapsed)} elapsed"
+            )
+            # Poll sooner again while the job is moving
+            interval = initial_interval
+            last_progress = progress
+        else:
+            interval = next_interval(interval, max_interval)
+
+        remaining = timeout - elapsed
+        if remaining <= 0:
+            job["status"] = "timeout"
+            return job
+        time.sleep(min(jittered(interval), remaining))
+
+
+def print_job_summary(client: AirbyteClient, job_id: str, job: Dict, label: str = "",
+                      stream_stats: Optional[List[Dict]] = None) -> None:
+    """Print the final status with total and per-stream rows and bytes (fetched unless given)."""
+    prefix = f"[{label}] " if label else ""
+    status = job.get("status", "unknown")
+    icon = "✓" if status == "succeeded" else "✗"
+    print(
+        f"{prefix}{icon} Job {job_id} {status}: "
+        f"{job.get('rowsSynced') or 0:,} rows, {format_bytes(job.get('bytesSynced') or 0)}"
+        + (f", duration {job['duration']}" if job.get("duration") else "")
+    )
+
+    if stream_stats is None:
+        stream_stats = client.get_job_stream_stats(job_id)
+    for stats in sorted(stream_stats, key=lambda s: s["bytes"], reverse=True):
+        print(f"{prefix}    {stats['stream']:<20} {stats['records']:>12,} rows  {format_bytes(stats['bytes']):>10}")
+
+
+def exit_code_for(job: Dict) -> int:
+    """Process exit code for a job's final status."""
+    status = job.get("status")
+    if status == "timeout":
+        return EXIT_TIMEOUT
+    return EXIT_CODES.get(status, EXIT_CODES["failed"])
@@ -0,0 +1,211 @@
+"""
+Load test for the Airbyte ingestion client against the in-process simulator.
+Provisions N tenant connections through provision.py's plan/apply, re-plans the
+provisioned workspace (paginated listing only), then triggers every connection
+through trigger_sync.start_sync (optionally waiting for the jobs), and reports
+per phase: requests per second, operations per second and request latency
+percentiles as seen by the client (retries and token refreshes included).
+
+Usage: python load_test.py --connections 200 [--max-workers 16] [--latency 0.02]
+                           [--error-rate 0.02] [--conflict-rate 0.05] [--token-lifetime 3]
+                           [--wait] [--json report.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import yaml
+from requests.adapters import HTTPAdapter
+
+from airbyte_simulator import AirbyteSimulator
+from http_metrics import HttpMetrics, percentile
+from job_waiter import wait_for_job
+from provision import CONNECTION_FIELDS, RESOURCE_FIELDS, apply, plan
+from resource_index import ResourceIndex
+from setup_airbyte import AirbyteClient
+from trigger_sync import start_sync
+
+
+SPEC_TEMPLATE = Path(__file__).resolve().parent / "pipelines.yml"
+
+
+def tenant_spec(connections: int) -> Dict:
+    """Pipeline spec with one source and connection per tenant and a shared destination."""
+    template = yaml.safe_load(SPEC_TEMPLATE.read_text())
+    connection = template["connections"][0]
+    names = [f"tenant_{i:04d}" for i in range(connections)]
+    return {
+        "sources": [{"name": name, "type": "postgres", "replication_method": "Standard"} for name in names],
+        "destinations": [{
+            "name": "Databricks", "type": "databricks", "host": "simulated", "http_path": "/simulated",
+            "token": "simulated", "catalog": "workspace", "schema": "dvd_rental",
+        }],
+        "connections": [
+            {**connection, "name": f"{name} → Databricks", "source": name, "destination": "Databricks"}
+            for name in names
+        ],
+    }
+
+
+def build_client(simulator: AirbyteSimulator, max_workers: int) -> AirbyteClient:
+    client = AirbyteClient(simulator.url, client_id="load-test", client_secret="load-test")
+    adapter = HTTPAdapter(pool_maxsize=max(max_workers, 1))
+    client.session.mount("http://", adapter)
+    return client
+
+
+def run_phase(name: str, client: AirbyteClient, func: Callable[[], int], verbose: bool = False) -> Dict:
+    """
+    Run one phase with fresh HTTP metrics on the client's session.
+    func returns the number of operations it completed; client output is hidden unless verbose.
+    """
+    metrics = HttpMetrics()
+    metrics.instrument(client.session)
+    refreshes = client.token_manager.refresh_count
+
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    try:
+        with output:
+            operations = func()
+    finally:
+        client.session.hooks["response"].remove(metrics.response_hook)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(sample for stats in metrics.endpoints.values() for sample in stats.samples)
+    statuses: Dict[str, int] = {}
+    for stats in metrics.endpoints.values():
+        for status, count in stats.statuses.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    requests_made = sum(stats.count for stats in metrics.endpoints.values())
+    return {
+        "phase": name,
+        "operations": operations,
+        "seconds": round(elapsed, 3),
+        "operations_per_second": round(operations / elapsed, 1) if elapsed else 0.0,
+        "requests": requests_made,
+        "requests_per_second": round(requests_made / elapsed, 1) if elapsed else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "token_refreshes": client.token_manager.refresh_count - refreshes,
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "max": round(latencies[-1], 4) if latencies else 0.0,
+        },
+        "endpoints": metrics.summary()["endpoints"],
+    }
+
+
+def provision_phase(client: AirbyteClient, spec: Dict, max_workers: int) -> int:
+    """Plan against the current workspace and apply; returns the number of actions applied."""
+    sources = ResourceIndex.build(client, "sources", fields=RESOURCE_FIELDS)
+    destinations = ResourceIndex.build(client, "destinations", fields=RESOURCE_FIELDS)
+    connections = ResourceIndex.build(client, "connections", fields=CONNECTION_FIELDS)
+    actions = [a for a in plan(spec, sources, destinations, connections) if a["action"] != "noop"]
+    failures = apply(client, actions, max_workers=max_workers, refresh_catalog=True)
+    if failures:
+        raise Exception(f"{len(failures)} provisioning actions failed, first: {failures[0]}")
+    return len(actions)
+
+
+def trigger_phase(client: AirbyteClient, max_workers: int, wait: bool, job_seconds: float) -> int:
+    """Trigger every connection (and wait for the jobs); returns the number of connections started."""
+    connections = list(ResourceIndex.build(client, "connections"))
+
+    def trigger(connection: Dict) -> bool:
+        job_id = start_sync(client, connection)
+        if job_id and wait:
+            wait_for_job(client, job_id, timeout=max(60, job_seconds * 20),
+                         initial_interval=max(job_seconds / 4, 0.05), max_interval=max(job_seconds, 0.1))
+        return bool(job_id)
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        return sum(pool.map(trigger, connections))
+
+
+def print_report(results: List[Dict], server: Dict) -> None:
+    print(f"\n{'phase':<12}{'ops':>7}{'ops/s':>9}{'requests':>10}{'req/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  statuses")
+    for result in results:
+        latency = result["latency_seconds"]
+        statuses = ", ".join(f"{status}:{count}" for status, count in result["statuses"].items())
+        print(
+            f"{result['phase']:<12}{result['operations']:>7}{result['operations_per_second']:>9.1f}"
+            f"{result['requests']:>10}{result['requests_per_second']:>9.1f}"
+            f"{latency['p50'] * 1000:>9.1f}{latency['p95'] * 1000:>9.1f}{latency['p99'] * 1000:>9.1f}"
+            f"{latency['max'] * 1000:>9.1f}  {statuses}"
+        )
+    print(f"\nServer: {server['requests']} requests, {server['injected_5xx']} injected 5xx, "
+          f"{server['conflicts']} conflicts (409), {server['expired_tokens']} expired tokens, "
+          f"{server['tokens_issued']} tokens issued")
+    print(f"        {server['sources']} sources, {server['destinations']} destinations, "
+          f"{server['connections']} connections, {server['jobs']} jobs")
+
+
+def main():
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description="Load-test the Airbyte client against the in-process simulator.")
+    parser.add_argument("--connections", type=int, default=50, help="Tenant connections to provision (default: 50)")
+    parser.add_argument("--max-workers", type=int, default=8, help="Parallel client calls (default: 8)")
+    parser.add_argument("--latency", type=float, default=0.01, help="Base server latency in seconds (default: 0.01)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Mean extra latency in seconds (default: 0.01)")
+    parser.add_argument("--discover-latency", type=float, default=0.2,
+                        help="Schema discovery latency in seconds (default: 0.2)")
+    parser.add_argument("--token-lifetime", type=float, default=3,
+                        help="Access token lifetime in seconds; short so tokens expire during the run (default: 3)")
+    parser.add_argument("--page-size", type=int, default=20, help="Maximum items per list page (default: 20)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls failing with 5xx")
+    parser.add_argument("--conflict-rate", type=float, default=0.0,
+                        help="Fraction of job creations answered with 409")
+    parser.add_argument("--job-seconds", type=float, default=1.0, help="Simulated sync duration (default: 1)")
+    parser.add_argument("--wait", action="store_true", help="Wait for the triggered jobs to finish")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the injected faults")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the client's output")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Airbyte client load test: {args.connections} connections, {args.max_workers} workers")
+    print("=" * 60)
+
+    simulator = AirbyteSimulator(
+        latency=args.latency, jitter=args.jitter, discover_latency=args.discover_latency,
+        token_lifetime=args.token_lifetime, max_page_size=args.page_size, error_rate=args.error_rate,
+        conflict_rate=args.conflict_rate, job_seconds=args.job_seconds, seed=args.seed
+    )
+    results = []
+    try:
+        with simulator:
+            client = build_client(simulator, args.max_workers)
+            client.authenticate()
+            spec = tenant_spec(args.connections)
+            phases = [
+                ("provision", lambda: provision_phase(client, spec, args.max_workers)),
+                ("replan", lambda: provision_phase(client, spec, args.max_workers)),
+                ("trigger", lambda: trigger_phase(client, args.max_workers, args.wait, args.job_seconds)),
+            ]
+            for name, func in phases:
+                print(f"⟳ {name}...")
+                results.append(run_phase(name, client, func, args.verbose))
+                print(f"✓ {name}: {results[-1]['operations']} operations in {results[-1]['seconds']:.2f}s")
+            server = simulator.summary()
+    except Exception as e:
+        print(f"✗ Load test failed: {e}")
+        sys.exit(1)
+
+    print_report(results, server)
+    if args.json:
+        Path(args.json).write_text(json.dumps({"args": vars(args), "phases": results, "server": server}, indent=2) + "\n")
+        print(f"✓ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
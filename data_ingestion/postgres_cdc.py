@@ -0,0 +1,144 @@
+"""
+PostgreSQL setup for Airbyte CDC (logical replication) syncs of the dvd_rental database.
+Creates the replication slot and publication Airbyte reads the WAL from, and validates
+the server configuration before the source is created.
+
+Requires the source database to run with wal_level=logical
+(see data_source/docker-compose.yml).
+"""
+
+import os
+from typing import Dict, List
+
+import psycopg
+from psycopg import sql
+
+
+REPLICATION_SLOT = "airbyte_dvd_rental_slot"
+PUBLICATION = "airbyte_dvd_rental_publication"
+
+# Output plugin used by the Airbyte Postgres source for CDC
+PLUGIN = "pgoutput"
+
+
+def get_connection_info() -> Dict[str, str]:
+    """Connection settings for the source database as seen from this machine."""
+    return {
+        "host": os.getenv("POSTGRES_HOST", "localhost"),
+        "port": os.getenv("POSTGRES_PORT", "5433"),
+        "dbname": os.getenv("POSTGRES_DB", "dvd_rental"),
+        "user": os.getenv("POSTGRES_USER", "postgres"),
+        "password": os.getenv("POSTGRES_PASSWORD", "postgres"),
+    }
+
+
+def ensure_replication_slot(conn: psycopg.Connection, slot: str = REPLICATION_SLOT) -> None:
+    """Create the logical replication slot if it does not exist."""
+    existing = conn.execute(
+        "select plugin from pg_replication_slots where slot_name = %s", (slot,)
+    ).fetchone()
+    if existing:
+        print(f"✓ Found existing replication slot: {slot}")
+        return
+
+    conn.execute("select pg_create_logical_replication_slot(%s, %s)", (slot, PLUGIN))
+    print(f"✓ Created replication slot: {slot}")
+
+
+def ensure_publication(conn: psycopg.Connection, tables: List[str], publication: str = PUBLICATION,
+                       schema: str = "public") -> None:
+    """Create the publication, or add any tables it is missing."""
+    table_identifiers = [sql.Identifier(schema, table) for table in tables]
+
+    exists = conn.execute("select 1 from pg_publication where pubname = %s", (publication,)).fetchone()
+    if not exists:
+        conn.execute(
+            sql.SQL("create publication {} for table {}").format(
+                sql.Identifier(publication), sql.SQL(", ").join(table_identifiers)
+            )
+        )
+        print(f"✓ Created publication {publication} for {len(tables)} tables")
+        return
+
+    published = {
+        row[0] for row in conn.execute(
+            "select tablename from pg_publication_tables where pubname = %s and schemaname = %s",
+            (publication, schema)
+        )
+    }
+    missing = [sql.Identifier(schema, table) for table in tables if table not in published]
+    if missing:
+        conn.execute(
+            sql.SQL("alter publication {} add table {}").format(
+                sql.Identifier(publication), sql.SQL(", ").join(missing)
+            )
+        )
+        print(f"✓ Added {len(missing)} tables to publication {publication}")
+    else:
+        print(f"✓ Found existing publication: {publication}")
+
+
+def validate_cdc(conn: psycopg.Connection, tables: List[str], slot: str = REPLICATION_SLOT,
+                 publication: str = PUBLICATION, schema: str = "public") -> List[str]:
+    """Check everything CDC needs on the server. Returns a list of problems (empty if valid)."""
+    problems = []
+
+    wal_level = conn.execute("show wal_level").fetchone()[0]
+    if wal_level != "logical":
+        problems.append(f"wal_level is '{wal_level}', expected 'logical'")
+
+    slot_row = conn.execute(
+        "select plugin, database from pg_replication_slots where slot_name = %s", (slot,)
+    ).fetchone()
+    if not slot_row:
+        problems.append(f"replication slot {slot} does not exist")
+    elif slot_row[0] != PLUGIN or slot_row[1] != conn.info.dbname:
+        problems.append(f"replication slot {slot} uses plugin {slot_row[0]} on database {slot_row[1]}")
+
+    published = {
+        row[0] for row in conn.execute(
+            "select tablename from pg_publication_tables where pubname = %s and schemaname = %s",
+            (publication, schema)
+        )
+    }
+    for table in tables:
+        if table not in published:
+            problems.append(f"table {schema}.{table} is not in publication {publication}")
+
+    # Updates and deletes are only replicated for tables with a replica identity
+    rows = conn.execute(
+        """
+        select c.relname
+        from pg_class c
+        join pg_namespace n on n.oid = c.relnamespace
+        where n.nspname = %s and c.relname = any(%s) and c.relreplident = 'n'
+        """,
+        (schema, tables)
+    ).fetchall()
+    for (table,) in rows:
+        problems.append(f"table {schema}.{table} has replica identity NOTHING")
+
+    return problems
+
+
+def setup_cdc(tables: List[str], slot: str = REPLICATION_SLOT, publication: str = PUBLICATION) -> None:
+    """Create the replication slot and publication for the given tables, then validate them."""
+    print("⟳ Setting up logical replication on the source database...")
+
+    with psycopg.connect(**get_connection_info(), autocommit=True) as conn:
+        wal_level = conn.execute("show wal_level").fetchone()[0]
+        if wal_level != "logical":
+            raise Exception(
+                f"CDC requires wal_level=logical on the source database (currently '{wal_level}'). "
+                "Restart Postgres with `-c wal_level=logical`."
+            )
+
+        ensure_replication_slot(conn, slot)
+        ensure_publication(conn, tables, publication)
+
+        problems = validate_cdc(conn, tables, slot, publication)
+        if problems:
+            raise Exception("CDC validation failed:\n  - " + "\n  - ".join(problems))
+
+    print("✓ Logical replication validated")
+    print("  Note: an unused replication slot retains WAL; drop it if CDC syncs are disabled.")
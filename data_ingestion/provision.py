@@ -0,0 +1,407 @@
+"""
+Bulk provisioning of Airbyte resources from a declarative pipeline spec.
+Usage: python provision.py [spec_file] [--dry-run] [--max-workers N] [--refresh-catalog]
+
+Fetches the workspace state once (one paginated list per resource type), plans the
+creates and patches needed to match the spec, and applies them in parallel where
+dependencies allow: sources and destinations first, then connections.
+
+Sources and destinations are patched when their configuration differs from the
+spec. Secrets come back masked from the API, so a changed password or token is
+not detected; recreate the resource (or change it in the UI) to rotate one.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import requests
+import yaml
+from requests.adapters import HTTPAdapter
+
+from catalog_cache import CatalogCache
+from resource_index import INDEXED_FIELDS, ResourceIndex
+from setup_airbyte import (
+    AirbyteClient,
+    build_configured_streams,
+    build_databricks_destination_config,
+    build_postgres_source_config,
+)
+
+
+DEFAULT_SPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipelines.yml")
+
+# List entries also carry the configuration (sources, destinations) and stream
+# configurations (connections), which the planner diffs against the spec
+RESOURCE_FIELDS = INDEXED_FIELDS + ("configuration",)
+CONNECTION_FIELDS = INDEXED_FIELDS + ("configurations",)
+
+# Public API sync mode names -> (syncMode, destinationSyncMode)
+PUBLIC_SYNC_MODES = {
+    "full_refresh_overwrite": ("full_refresh", "overwrite"),
+    "full_refresh_append": ("full_refresh", "append"),
+    "incremental_append": ("incremental", "append"),
+    "incremental_deduped_history": ("incremental", "append_dedup"),
+}
+
+# ${VAR} reference left in a string when VAR is not set
+ENV_REFERENCE = re.compile(r"\$\{(\w+)\}")
+
+SOURCE_TYPES = ("postgres",)
+DESTINATION_TYPES = ("databricks",)
+
+
+def _expand_env(value):
+    """Expand ${VAR} references in every string of the spec."""
+    if isinstance(value, str):
+        return os.path.expandvars(value)
+    if isinstance(value, list):
+        return [_expand_env(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _expand_env(item) for key, item in value.items()}
+    return value
+
+
+def _unresolved_env(value) -> List[str]:
+    """Names of the ${VAR} references still present in the (expanded) spec."""
+    if isinstance(value, str):
+        return ENV_REFERENCE.findall(value)
+    if isinstance(value, list):
+        return [name for item in value for name in _unresolved_env(item)]
+    if isinstance(value, dict):
+        return [name for item in value.values() for name in _unresolved_env(item)]
+    return []
+
+
+def load_spec(path: str) -> Dict:
+    """Load and validate a YAML or JSON pipeline spec."""
+    with open(path) as f:
+        spec = json.load(f) if path.endswith(".json") else yaml.safe_load(f)
+    spec = _expand_env(spec or {})
+    for section in ("sources", "destinations", "connections"):
+        spec.setdefault(section, [])
+
+    errors = []
+    unresolved = sorted(set(_unresolved_env(spec)))
+    if unresolved:
+        errors.append(f"environment variables not set: {', '.join(unresolved)}")
+    for section, types in (("sources", SOURCE_TYPES), ("destinations", DESTINATION_TYPES)):
+        names = [item.get("name") for item in spec[section]]
+        if len(names) != len(set(names)):
+            errors.append(f"duplicate {section} names")
+        for item in spec[section]:
+            if item.get("type") not in types:
+                errors.append(f"{section} {item.get('name')}: unsupported type {item.get('type')}")
+
+    source_names = {s["name"] for s in spec["sources"]}
+    destination_names = {d["name"] for d in spec["destinations"]}
+    for conn in spec["connections"]:
+        if conn.get("source") not in source_names:
+            errors.append(f"connection {conn.get('name')}: unknown source {conn.get('source')}")
+        if conn.get("destination") not in destination_names:
+            errors.append(f"connection {conn.get('name')}: unknown destination {conn.get('destination')}")
+
+    if errors:
+        raise Exception(f"Invalid pipeline spec {path}:\n  - " + "\n  - ".join(errors))
+    return spec
+
+
+def normalize_streams(configurations: Dict) -> Dict[str, Tuple]:
+    """
+    Map stream name -> (syncMode, destinationSyncMode, cursorField, primaryKey).
+    Accepts both the public API shape and the shape built by build_configured_streams.
+    """
+    normalized = {}
+    for stream in (configurations or {}).get("streams", []):
+        if "config" in stream:
+            name = stream.get("stream", {}).get("name")
+            config = stream["config"]
+            modes = (config.get("syncMode"), config.get("destinationSyncMode"))
+        else:
+            name = stream.get("name")
+            config = stream
+            modes = PUBLIC_SYNC_MODES.get(stream.get("syncMode"), (stream.get("syncMode"), None))
+        normalized[name] = (
+            *modes,
+            tuple(config.get("cursorField") or ()),
+            tuple(tuple(key) for key in config.get("primaryKey") or ()),
+        )
+    return normalized
+
+
+def desired_configuration(kind: str, item: Dict) -> Dict:
+    """The configuration a source or destination spec entry is created with."""
+    if kind == "source":
+        return build_postgres_source_config(
+            "", replication_method=item.get("replication_method", "Standard"), overrides=item.get("configuration")
+        )["configuration"]
+    return build_databricks_destination_config(
+        "", item["host"], item["http_path"], item["token"],
+        item.get("catalog", "workspace"), item.get("schema", "dvd_rental")
+    )["configuration"]
+
+
+def diff_configuration(existing: Dict, desired: Dict, prefix: str = "") -> List[str]:
+    """
+    Keys (dotted paths) whose value in the existing configuration differs from the
+    spec. Masked secrets ("**********") cannot be compared and are skipped.
+    """
+    changed = []
+    for key, wanted in desired.items():
+        path = f"{prefix}{key}"
+        current = existing.get(key)
+        if isinstance(wanted, dict) and isinstance(current, dict):
+            changed.extend(diff_configuration(current, wanted, f"{path}."))
+        elif isinstance(current, str) and current and set(current) == {"*"}:
+            continue
+        elif current is None or str(current) != str(wanted):
+            changed.append(path)
+    return changed
+
+
+def diff_connection(existing: Dict, conn_spec: Dict) -> List[str]:
+    """
+    Compare an existing connection's streams with the spec's policies, without a catalog.
+    Returns the names of streams that differ (empty if the connection is up to date).
+
+    Without the catalog it is unknown whether a stream has a source-defined cursor
+    (CDC) or supports incremental syncs at all, so every policy choose_sync_mode can
+    pick for the stream counts as up to date: a source-defined cursor, the spec's
+    cursor, or the Full Refresh | Overwrite fallback.
+    """
+    current = normalize_streams(existing.get("configurations"))
+    if not current:
+        return ["<no streams configured>"]
+
+    primary_keys = conn_spec.get("primary_keys") or {}
+    cursor_fields = conn_spec.get("cursor_fields") or {}
+    changed = [name for name in primary_keys if name not in current]
+
+    for name, (sync_mode, destination_sync_mode, cursor, primary_key) in current.items():
+        wanted = {("full_refresh", "overwrite", ()), ("incremental", "append_dedup", ())}
+        if name in cursor_fields:
+            wanted.add(("incremental", "append_dedup", (cursor_fields[name],)))
+        if (sync_mode, destination_sync_mode, cursor) not in wanted:
+            changed.append(name)
+        elif name in primary_keys and primary_key != tuple((key,) for key in primary_keys[name]):
+            changed.append(name)
+    return changed
+
+
+def plan(spec: Dict, sources: ResourceIndex, destinations: ResourceIndex,
+         connections: ResourceIndex) -> List[Dict]:
+    """Work out which resources to create or patch so the workspace matches the spec."""
+    actions = []
+    for kind, items, index in (("source", spec["sources"], sources),
+                               ("destination", spec["destinations"], destinations)):
+        for item in items:
+            existing = index.get_by_name(item["name"])
+            action = {"kind": kind, "name": item["name"], "spec": item, "id": None, "action": "create"}
+            if existing:
+                action["id"] = existing[index.id_field]
+                changed = []
+                # Entries listed without their configuration cannot be diffed
+                if existing.get("configuration") is not None:
+                    changed = diff_configuration(existing["configuration"], desired_configuration(kind, item))
+                action["action"] = "patch" if changed else "noop"
+                action["reason"] = f"configuration: {', '.join(changed)}" if changed else ""
+            actions.append(action)
+
+    ids = {(a["kind"], a["name"]): a["id"] for a in actions}
+    for conn in spec["connections"]:
+        source_id = ids[("source", conn["source"])]
+        destination_id = ids[("destination", conn["destination"])]
+        existing = connections.get_by_name(conn["name"])
+        if not existing and source_id and destination_id:
+            existing = connections.get_by_endpoints(source_id, destination_id)
+
+        action = {"kind": "connection", "name": conn["name"], "spec": conn, "id": None, "action": "create"}
+        if existing:
+            action["id"] = existing["connectionId"]
+            action["existing_configurations"] = existing.get("configurations")
+            changed = diff_connection(existing, conn)
+            action["action"] = "patch" if changed else "noop"
+            action["reason"] = f"streams: {', '.join(changed)}" if changed else ""
+        actions.append(action)
+    return actions
+
+
+def print_plan(actions: List[Dict]) -> None:
+    """Print the planned changes."""
+    symbols = {"create": "+", "patch": "~", "noop": "="}
+    counts = {key: sum(1 for a in actions if a["action"] == key) for key in symbols}
+    print(f"Plan: {counts['create']} to create, {counts['patch']} to patch, {counts['noop']} unchanged")
+    for a in actions:
+        reason = f" ({a['reason']})" if a.get("reason") else ""
+        print(f"  {symbols[a['action']]} {a['kind']} {a['name']}{reason}")
+
+
+def _create_resource(client: AirbyteClient, action: Dict) -> str:
+    """Create a source or destination from its spec entry."""
+    item = action["spec"]
+    if action["kind"] == "source":
+        return client.create_postgres_source(
+            replication_method=item.get("replication_method", "Standard"),
+            name=item["name"],
+            overrides=item.get("configuration")
+        )
+    return client.create_databricks_destination(
+        host=item["host"],
+        http_path=item["http_path"],
+        token=item["token"],
+        catalog=item.get("catalog", "workspace"),
+        schema=item.get("schema", "dvd_rental"),
+        name=item["name"]
+    )
+
+
+def _patch_resource(client: AirbyteClient, action: Dict) -> str:
+    """Update a source's or destination's configuration to match its spec entry."""
+    configuration = desired_configuration(action["kind"], action["spec"])
+    if action["kind"] == "source":
+        client.update_source_configuration(action["id"], configuration)
+    else:
+        client.update_destination_configuration(action["id"], configuration)
+    return action["id"]
+
+
+def apply(client: AirbyteClient, actions: List[Dict], max_workers: int = 8,
+          refresh_catalog: bool = False) -> List[str]:
+    """Apply a plan. Independent actions run in parallel. Returns a list of failures."""
+    failures = []
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def run(label: str, func, *args):
+        try:
+            return func(*args)
+        except Exception as e:
+            failures.append(f"{label}: {e}")
+            print(f"✗ {label}: {e}")
+            return None
+
+    # Phase 1: sources and destinations (no dependencies between them)
+    resources = [a for a in actions if a["kind"] != "connection" and a["action"] != "noop"]
+    handlers = {"create": _create_resource, "patch": _patch_resource}
+    for a, resource_id in zip(resources, pool.map(
+            lambda a: run(f"{a['action']} {a['kind']} {a['name']}", handlers[a["action"]], client, a), resources)):
+        # A failed patch leaves the existing resource usable by its connections
+        a["id"] = resource_id or a["id"]
+    ids = {(a["kind"], a["name"]): a["id"] for a in actions if a["kind"] != "connection"}
+
+    pending = []
+    for a in actions:
+        if a["kind"] != "connection" or a["action"] == "noop":
+            continue
+        conn = a["spec"]
+        a["source_id"] = ids[("source", conn["source"])]
+        a["destination_id"] = ids[("destination", conn["destination"])]
+        if not (a["source_id"] and a["destination_id"]):
+            failures.append(f"{a['action']} connection {a['name']}: source or destination was not created")
+            continue
+        pending.append(a)
+
+    # Phase 2: one catalog per source (from the local cache when possible)
+    source_ids = sorted({a["source_id"] for a in pending})
+    catalogs = dict(zip(source_ids, pool.map(
+        lambda source_id: run(f"discover source {source_id}", client.get_source_schema, source_id, refresh_catalog),
+        source_ids)))
+
+    # Phase 3: create or patch connections
+    def apply_connection(a: Dict):
+        conn = a["spec"]
+        catalog = catalogs.get(a["source_id"])
+        if catalog is None:
+            raise Exception("no catalog available for its source")
+        if a["action"] == "create":
+            return client.create_connection_with_streams(
+                a["source_id"], a["destination_id"], catalog,
+                primary_keys=conn.get("primary_keys"),
+                cursor_fields=conn.get("cursor_fields"),
+                name=conn["name"]
+            )
+        # Streams that cannot run incrementally fall back to full refresh, which the
+        # catalog-free diff cannot know about; only patch if the real config differs
+        streams = build_configured_streams(catalog, conn.get("primary_keys"), conn.get("cursor_fields"))
+        existing = a.get("existing_configurations")
+        if existing and normalize_streams({"streams": streams}) == normalize_streams(existing):
+            print(f"= connection {conn['name']} already matches the spec")
+            return a["id"]
+        client.update_connection_streams(
+            a["id"], catalog,
+            primary_keys=conn.get("primary_keys"),
+            cursor_fields=conn.get("cursor_fields")
+        )
+        return a["id"]
+
+    list(pool.map(lambda a: run(f"{a['action']} connection {a['name']}", apply_connection, a), pending))
+    pool.shutdown()
+    return failures
+
+
+def main():
+    """Provision the resources described in a pipeline spec."""
+    parser = argparse.ArgumentParser(description="Provision Airbyte sources, destinations and connections from a spec.")
+    parser.add_argument("spec", nargs="?", default=DEFAULT_SPEC, help="Pipeline spec file (YAML or JSON)")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the plan")
+    parser.add_argument("--max-workers", type=int, default=8, help="Maximum parallel API calls (default: 8)")
+    parser.add_argument("--refresh-catalog", action="store_true", help="Ignore cached source catalogs")
+    args = parser.parse_args()
+
+    AIRBYTE_URL = os.getenv("AIRBYTE_URL", "http://localhost:8000/api")
+    CLIENT_ID = os.getenv("AIRBYTE_CLIENT_ID")
+    CLIENT_SECRET = os.getenv("AIRBYTE_CLIENT_SECRET")
+    ACCESS_TOKEN = os.getenv("AIRBYTE_ACCESS_TOKEN")
+
+    try:
+        spec = load_spec(args.spec)
+
+        if CLIENT_ID and CLIENT_SECRET:
+            client = AirbyteClient(AIRBYTE_URL, client_id=CLIENT_ID, client_secret=CLIENT_SECRET,
+                                   catalog_cache=CatalogCache())
+        elif ACCESS_TOKEN:
+            client = AirbyteClient(AIRBYTE_URL, api_key=ACCESS_TOKEN, catalog_cache=CatalogCache())
+        else:
+            raise Exception("Please provide either CLIENT_ID/CLIENT_SECRET or ACCESS_TOKEN")
+        adapter = HTTPAdapter(pool_maxsize=max(args.max_workers, 1))
+        client.session.mount("http://", adapter)
+        client.session.mount("https://", adapter)
+        client.authenticate()
+        client.get_workspace()
+
+        # Current workspace state, fetched once in bulk
+        sources = ResourceIndex.build(client, "sources", fields=RESOURCE_FIELDS)
+        destinations = ResourceIndex.build(client, "destinations", fields=RESOURCE_FIELDS)
+        connections = ResourceIndex.build(client, "connections", fields=CONNECTION_FIELDS)
+
+        actions = plan(spec, sources, destinations, connections)
+
+        print("\n" + "=" * 60)
+        print_plan(actions)
+        print("=" * 60)
+
+        if args.dry_run or all(a["action"] == "noop" for a in actions):
+            return
+
+        failures = apply(client, actions, max_workers=max(args.max_workers, 1),
+                         refresh_catalog=args.refresh_catalog)
+        if failures:
+            print(f"\n✗ {len(failures)} action(s) failed")
+            sys.exit(1)
+        print("\n✓ Workspace matches the pipeline spec")
+
+    except requests.exceptions.RequestException as e:
+        print(f"✗ Error: {e}")
+        if getattr(e, "response", None) is not None:
+            print(f"Response: {e.response.text}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
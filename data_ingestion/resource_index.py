@@ -0,0 +1,165 @@
+"""
+Paginated listing of Airbyte workspace resources.
+Streams sources, destinations and connections page by page and keeps a compact
+in-memory index so existing resources can be looked up by ID, name or endpoints.
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from setup_airbyte import AirbyteClient
+
+
+# ID field for each listable resource type
+RESOURCE_ID_FIELDS = {
+    "sources": "sourceId",
+    "destinations": "destinationId",
+    "connections": "connectionId",
+}
+
+# Only these fields are kept per resource; full payloads (e.g. connection stream
+# configurations) are dropped to keep the index small on large workspaces
+INDEXED_FIELDS = (
+    "sourceId",
+    "destinationId",
+    "connectionId",
+    "name",
+    "status",
+    "sourceType",
+    "destinationType",
+    "workspaceId",
+)
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def iter_resources(client: "AirbyteClient", resource: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict]:
+    """
+    Yield every item of a resource type in the client's workspace, one page at a time.
+    Follows the API's `next` link, falling back to offset paging when it is missing.
+    """
+    id_field = RESOURCE_ID_FIELDS[resource]
+    url = f"{client.base_url}/v1/{resource}"
+    params = {"workspaceId": client.workspace_id, "limit": page_size, "offset": 0}
+    previous_first_id = None
+
+    while url:
+        response = client.session.get(url, headers=client.get_headers(), params=params)
+        response.raise_for_status()
+        body = response.json()
+        page = body.get("data", [])
+        if not page:
+            return
+
+        # Stop if the server ignores paging and keeps returning the same page
+        first_id = page[0].get(id_field)
+        if first_id is not None and first_id == previous_first_id:
+            return
+        previous_first_id = first_id
+
+        yield from page
+
+        if body.get("next"):
+            # The next link already carries the paging query parameters
+            url, params = body["next"], None
+        elif len(page) == page_size and params is not None:
+            params = {**params, "offset": params["offset"] + page_size}
+        else:
+            return
+
+
+class ResourceIndex:
+    """In-memory index of one resource type keyed by ID, name, type and (sourceId, destinationId)."""
+
+    def __init__(self, resource: str, fields: Tuple[str, ...] = INDEXED_FIELDS):
+        self.resource = resource
+        self.id_field = RESOURCE_ID_FIELDS[resource]
+        self.fields = fields
+        self.by_id: Dict[str, Dict] = {}
+        self.by_name: Dict[str, List[str]] = {}
+        self.by_type: Dict[str, List[str]] = {}
+        self.by_endpoints: Dict[Tuple[str, str], List[str]] = {}
+
+    @classmethod
+    def build(cls, client: "AirbyteClient", resource: str, page_size: int = DEFAULT_PAGE_SIZE,
+              fields: Tuple[str, ...] = INDEXED_FIELDS) -> "ResourceIndex":
+        """Stream all resources of a type from the workspace into a new index."""
+        index = cls(resource, fields=fields)
+        for item in iter_resources(client, resource, page_size=page_size):
+            index.add(item)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.by_id.values())
+
+    def add(self, item: Dict) -> Dict:
+        """Add (or replace) a resource in the index and return its compact record."""
+        resource_id = item.get(self.id_field)
+        if resource_id in self.by_id:
+            self.remove(resource_id)
+
+        record = {key: item[key] for key in self.fields if key in item}
+        self.by_id[resource_id] = record
+        self.by_name.setdefault(record.get("name", "").lower(), []).append(resource_id)
+
+        resource_type = record.get("sourceType") or record.get("destinationType")
+        if resource_type:
+            self.by_type.setdefault(resource_type.lower(), []).append(resource_id)
+
+        if self.resource == "connections":
+            endpoints = (record.get("sourceId"), record.get("destinationId"))
+            self.by_endpoints.setdefault(endpoints, []).append(resource_id)
+        return record
+
+    def remove(self, resource_id: str) -> None:
+        """Drop a resource from the index."""
+        record = self.by_id.pop(resource_id, None)
+        if record is None:
+            return
+        for mapping, key in (
+            (self.by_name, record.get("name", "").lower()),
+            (self.by_type, (record.get("sourceType") or record.get("destinationType") or "").lower()),
+            (self.by_endpoints, (record.get("sourceId"), record.get("destinationId"))),
+        ):
+            ids = mapping.get(key)
+            if ids and resource_id in ids:
+                ids.remove(resource_id)
+                if not ids:
+                    del mapping[key]
+
+    def get(self, resource_id: str) -> Optional[Dict]:
+        """Look up a resource by exact ID."""
+        return self.by_id.get(resource_id)
+
+    def get_by_name(self, name: str) -> Optional[Dict]:
+        """Look up the first resource with this exact name (case-insensitive)."""
+        ids = self.by_name.get(name.lower())
+        return self.by_id[ids[0]] if ids else None
+
+    def get_by_type(self, resource_type: str) -> Optional[Dict]:
+        """Look up the first source or destination of a connector type (e.g. "databricks")."""
+        ids = self.by_type.get(resource_type.lower())
+        return self.by_id[ids[0]] if ids else None
+
+    def get_by_endpoints(self, source_id: str, destination_id: str) -> Optional[Dict]:
+        """Look up the first connection between a source and a destination."""
+        ids = self.by_endpoints.get((source_id, destination_id))
+        return self.by_id[ids[0]] if ids else None
+
+    def find(self, name_or_id: str) -> Optional[Dict]:
+        """
+        Find a resource by exact ID, then exact name, then partial name match.
+        Only the partial match has to scan the index.
+        """
+        record = self.get(name_or_id) or self.get_by_name(name_or_id)
+        if record:
+            return record
+
+        needle = name_or_id.lower()
+        for name, ids in self.by_name.items():
+            if needle in name:
+                return self.by_id[ids[0]]
+        return None
@@ -0,0 +1,296 @@
+"""
+Generate a scaled-up copy of the dvd_rental dump for load testing.
+Writes a complete pg_dump directory (toc.dat, restore.sql and all .dat segments) in
+which customer, inventory, rental and payment are scaled by an integer factor. The
+result can be restored with pg_restore or loaded with dump_loader.py.
+
+Usage: python scale_generator.py --scale 100 [--output-dir DIR] [--seed 42]
+
+Scale factor N produces N replicas of the original rows. Replica 0 is the original
+data; every other replica gets its own ID range and values drawn from the original
+distributions (names, addresses, rental durations, rental timing):
+- customers get new names and addresses, keeping store and activity flags
+- inventory keeps each copy's film and store (so film popularity is preserved)
+- rentals are spread over the replica's customers (a permutation of the originals),
+  with jittered rental dates and return dates from the observed rental durations
+- payments follow their rental, keeping amount and the rental-to-payment delay
+Foreign keys only ever point into the same replica (or to unscaled tables), so
+referential integrity holds at any scale. Replicas are generated in parallel and
+written one at a time, so memory use does not grow with the scale factor.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from copy_reader import CopyReader
+from dump_loader import DEFAULT_DUMP_DIR, REPO_ROOT, build_table_map, schema_for
+
+
+SCALED_TABLES = ("customer", "inventory", "rental", "payment")
+
+# Rental dates of generated replicas are shifted by up to this many seconds either way
+RENTAL_DATE_JITTER = 3 * 24 * 3600
+
+DEFAULT_REPLICAS_PER_TASK = 8
+
+# Scaled customer IDs outgrow the smallint references to them. The replacement has the
+# same length so the length-prefixed definitions in toc.dat stay valid.
+WIDENED_COLUMNS = ((b"customer_id smallint NOT NULL", b"customer_id integer  NOT NULL"),)
+
+_base: Optional[Dict[str, pa.Table]] = None
+
+
+def load_base(dump_dir: str) -> Dict[str, pa.Table]:
+    """The original rows of the scaled tables (loaded once per worker process)."""
+    global _base
+    if _base is None:
+        tables = {t["table"]: t for t in build_table_map(dump_dir)}
+        _base = {name: CopyReader(tables[name]["path"], tables[name]).read_all() for name in SCALED_TABLES}
+    return _base
+
+
+def id_spans(base: Dict[str, pa.Table]) -> Dict[str, int]:
+    """ID range reserved per replica for each scaled table."""
+    return {
+        name: int(pc.max(base[name].column(f"{name}_id")).as_py())
+        for name in SCALED_TABLES
+    }
+
+
+def _shift(column: pa.ChunkedArray, offset: int) -> pa.Array:
+    return pc.add(column.cast(pa.int64()), offset)
+
+
+def _replace(table: pa.Table, name: str, values) -> pa.Table:
+    return table.set_column(table.schema.get_field_index(name), name, values)
+
+
+def generate_replica(base: Dict[str, pa.Table], replica: int, seed: int) -> Dict[str, pa.Table]:
+    """Generate one replica of the scaled tables; replica 0 is the original data."""
+    if replica == 0:
+        return dict(base)
+
+    rng = np.random.default_rng([seed, replica])
+    spans = id_spans(base)
+    offsets = {name: replica * span for name, span in spans.items()}
+
+    # Customers: new names and addresses drawn from the original values
+    customer = base["customer"]
+    n_customers = customer.num_rows
+    first_names = pc.take(customer.column("first_name"), rng.integers(0, n_customers, n_customers))
+    last_names = pc.take(customer.column("last_name"), rng.integers(0, n_customers, n_customers))
+    emails = pc.binary_join_element_wise(
+        pc.utf8_lower(first_names), pc.utf8_lower(last_names),
+        pa.scalar(f"{replica}@sakilacustomer.org"), "."
+    )
+    customer = _replace(customer, "customer_id", _shift(customer.column("customer_id"), offsets["customer"]))
+    customer = _replace(customer, "first_name", first_names)
+    customer = _replace(customer, "last_name", last_names)
+    customer = _replace(customer, "email", emails)
+    customer = _replace(customer, "address_id", pc.take(customer.column("address_id"), rng.permutation(n_customers)))
+
+    # Inventory: same films and stores under new IDs
+    inventory = base["inventory"]
+    inventory = _replace(inventory, "inventory_id", _shift(inventory.column("inventory_id"), offsets["inventory"]))
+
+    # Rentals: customers permuted within the replica, dates jittered, durations resampled
+    rental = base["rental"]
+    n_rentals = rental.num_rows
+    customer_ids = base["customer"].column("customer_id").to_numpy()
+    customer_map = np.zeros(spans["customer"] + 1, dtype=np.int64)
+    customer_map[customer_ids] = rng.permutation(customer_ids) + offsets["customer"]
+    rental_customers = customer_map[rental.column("customer_id").to_numpy()]
+
+    rental_dates = rental.column("rental_date").to_numpy().astype("datetime64[s]")
+    rental_dates = rental_dates + rng.integers(-RENTAL_DATE_JITTER, RENTAL_DATE_JITTER + 1, n_rentals).astype("timedelta64[s]")
+    returned = pc.is_valid(rental.column("return_date")).to_numpy(zero_copy_only=False)
+    durations = (
+        rental.column("return_date").to_numpy().astype("datetime64[s]")
+        - rental.column("rental_date").to_numpy().astype("datetime64[s]")
+    )[returned]
+    sampled = rng.integers(0, len(durations), n_rentals)
+    return_dates = pa.array(rental_dates + durations[sampled], type=pa.timestamp("s"), mask=~returned)
+
+    rental = _replace(rental, "rental_id", _shift(rental.column("rental_id"), offsets["rental"]))
+    rental = _replace(rental, "rental_date", pa.array(rental_dates, type=pa.timestamp("s")).cast(pa.timestamp("us")))
+    rental = _replace(rental, "inventory_id", _shift(rental.column("inventory_id"), offsets["inventory"]))
+    rental = _replace(rental, "customer_id", pa.array(rental_customers))
+    rental = _replace(rental, "return_date", return_dates.cast(pa.timestamp("us")))
+
+    # Payments: follow their rental's new customer and date
+    payment = base["payment"]
+    base_rental_ids = base["rental"].column("rental_id").to_numpy()
+    order = np.argsort(base_rental_ids)
+    positions = order[np.searchsorted(base_rental_ids, payment.column("rental_id").to_numpy(), sorter=order)]
+    delays = (
+        payment.column("payment_date").to_numpy()
+        - base["rental"].column("rental_date").to_numpy()[positions]
+    )
+    payment_dates = rental_dates.astype("datetime64[us]")[positions] + delays
+
+    payment = _replace(payment, "payment_id", _shift(payment.column("payment_id"), offsets["payment"]))
+    payment = _replace(payment, "customer_id", pa.array(rental_customers[positions]))
+    payment = _replace(payment, "rental_id", _shift(payment.column("rental_id"), offsets["rental"]))
+    payment = _replace(payment, "payment_date", pa.array(payment_dates, type=pa.timestamp("us")))
+
+    return {"customer": customer, "inventory": inventory, "rental": rental, "payment": payment}
+
+
+def _whole_seconds(column: pa.ChunkedArray) -> bool:
+    truncated = pc.cast(column, pa.timestamp("s"), safe=False).cast(column.type)
+    return not pc.any(pc.not_equal(truncated, column)).as_py()
+
+
+def _copy_escape(strings: pa.Array) -> pa.Array:
+    for raw, escaped in (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r")):
+        strings = pc.replace_substring(strings, raw, escaped)
+    return strings
+
+
+def to_copy_text(table: pa.Table) -> memoryview:
+    """Format a table as COPY text rows without building per-row Python objects."""
+    columns = []
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_boolean(field.type):
+            text = pc.if_else(column, "t", "f")
+        elif pa.types.is_timestamp(field.type) and _whole_seconds(column):
+            # Whole-second timestamps are written without a fraction, as pg_dump does
+            text = pc.cast(pc.cast(column, pa.timestamp("s")), pa.string())
+        else:
+            text = pc.cast(column, pa.string())
+            if pa.types.is_string(field.type):
+                text = _copy_escape(text)
+        columns.append(pc.fill_null(text, "\\N"))
+
+    rows = pc.binary_join_element_wise(pc.binary_join_element_wise(*columns, "\t"), "\n", "")
+    rows = rows.combine_chunks() if isinstance(rows, pa.ChunkedArray) else rows
+    offsets = np.frombuffer(rows.buffers()[1], dtype=np.int32)[rows.offset:rows.offset + len(rows) + 1]
+    return memoryview(rows.buffers()[2])[offsets[0]:offsets[-1]]
+
+
+def generate_replicas(dump_dir: str, output_dir: str, first: int, last: int, seed: int) -> Dict[str, int]:
+    """Write replicas [first, last) as part files, one per scaled table. Returns row counts."""
+    base = load_base(dump_dir)
+    # Column order and (widened) types of the output dump
+    tables = {t["table"]: t for t in build_table_map(output_dir)}
+    counts = {name: 0 for name in SCALED_TABLES}
+
+    files = {
+        name: open(Path(output_dir) / ".parts" / f"{tables[name]['filename']}.{first:08d}", "wb")
+        for name in SCALED_TABLES
+    }
+    try:
+        for replica in range(first, last):
+            generated = generate_replica(base, replica, seed)
+            for name in SCALED_TABLES:
+                table = generated[name].select([c["name"] for c in tables[name]["columns"]])
+                files[name].write(to_copy_text(table.cast(schema_for(tables[name]))))
+                counts[name] += table.num_rows
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+def generate(
+    scale: int,
+    output_dir: Path,
+    dump_dir: Path = DEFAULT_DUMP_DIR,
+    seed: int = 42,
+    max_workers: Optional[int] = None,
+    replicas_per_task: int = DEFAULT_REPLICAS_PER_TASK
+) -> Dict[str, int]:
+    """Write a dump directory with the scaled tables. Returns total rows per scaled table."""
+    if scale < 1:
+        raise Exception("Scale factor must be at least 1")
+    dump_dir, output_dir = Path(dump_dir), Path(output_dir)
+    tables = {t["table"]: t for t in build_table_map(dump_dir)}
+    parts_dir = output_dir / ".parts"
+    if parts_dir.exists():
+        shutil.rmtree(parts_dir)
+    parts_dir.mkdir(parents=True)
+
+    # Metadata (with widened ID columns) and unscaled segments are copied
+    for name in ("toc.dat", "restore.sql"):
+        content = (dump_dir / name).read_bytes()
+        for original, widened in WIDENED_COLUMNS:
+            content = content.replace(original, widened)
+        (output_dir / name).write_bytes(content)
+    for name, table in tables.items():
+        if name not in SCALED_TABLES:
+            shutil.copyfile(table["path"], output_dir / table["filename"])
+
+    totals = {name: 0 for name in SCALED_TABLES}
+    tasks = [(first, min(scale, first + replicas_per_task)) for first in range(0, scale, replicas_per_task)]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(generate_replicas, str(dump_dir), str(output_dir), first, last, seed)
+            for first, last in tasks
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            for name, count in future.result().items():
+                totals[name] += count
+            print(f"⟳ Generated {done}/{len(tasks)} replica batches")
+
+    # Concatenate the parts in replica order and terminate each segment
+    for name in SCALED_TABLES:
+        filename = tables[name]["filename"]
+        with open(output_dir / filename, "wb") as out:
+            for first, _ in tasks:
+                part = parts_dir / f"{filename}.{first:08d}"
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out, 16 * 1024 * 1024)
+                os.remove(part)
+            out.write(b"\\.\n\n")
+    shutil.rmtree(parts_dir)
+    return totals
+
+
+def main():
+    """Generate a scaled dump from the command line."""
+    parser = argparse.ArgumentParser(description="Generate a scaled-up dvd_rental dump for load testing.")
+    parser.add_argument("--scale", type=int, default=10, help="Scale factor (number of replicas, e.g. 10-1000)")
+    parser.add_argument("--dump-dir", default=str(DEFAULT_DUMP_DIR), help="Original pg_dump directory")
+    parser.add_argument("--output-dir", help="Output dump directory (default: local_warehouse/dvdrental_sf<scale>)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (output is reproducible per seed)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--replicas-per-task", type=int, default=DEFAULT_REPLICAS_PER_TASK,
+                        help="Replicas generated per worker task")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir or REPO_ROOT / "local_warehouse" / f"dvdrental_sf{args.scale}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 60)
+    print(f"Generating dvd_rental at scale factor {args.scale}")
+    print("=" * 60)
+    start = time.perf_counter()
+
+    try:
+        totals = generate(
+            args.scale, output_dir, args.dump_dir, seed=args.seed,
+            max_workers=args.workers, replicas_per_task=args.replicas_per_task
+        )
+    except Exception as e:
+        print(f"✗ Generation failed: {e}")
+        sys.exit(1)
+
+    for name, count in totals.items():
+        print(f"✓ {name:<10} {count:>14,} rows")
+    print("=" * 60)
+    print(f"✓ Wrote {output_dir} in {time.perf_counter() - start:.1f}s")
+    print(f"  Load it with: python data_ingestion/dump_loader.py --dump-dir {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,18 +3,231 @@ Airbyte setup script for PostgreSQL to Databricks data ingestion.
 This script configures source, destination, and connection for the dvd_rental database.
 """
 
+import argparse
 import requests
 import json
 import os
 import sys
 from typing import Dict, List, Optional
 
+from catalog_cache import CatalogCache
+from http_metrics import instrument_from_env
+from resource_index import ResourceIndex, iter_resources
+from token_manager import BearerTokenAuth, TokenManager
+from transport import RetryingSession, create_with_retry
+
+
+# Standard connector definition IDs (the same across Airbyte deployments).
+# Using them avoids the forbidden source_definitions endpoint.
+POSTGRES_SOURCE_DEFINITION_ID = "decd338e-5647-4c0b-adf4-da0e75f5a750"
+DATABRICKS_DESTINATION_DEFINITION_ID = "072d5540-f236-4294-ba7c-ade8fd918496"
+
+# Replication methods supported by the Postgres source
+REPLICATION_METHODS = ("Standard", "Xmin", "CDC")
+
+# (connect, read) timeout for schema discovery, which can take minutes on large databases
+DISCOVER_TIMEOUT = (10, 600)
+
+
+def build_replication_method(method: str = "Standard") -> Dict:
+    """Build the Postgres source replication_method block."""
+    if method == "CDC":
+        # Reads changes from the WAL through the slot and publication set up by postgres_cdc
+        from postgres_cdc import PLUGIN, PUBLICATION, REPLICATION_SLOT
+        return {
+            "method": "CDC",
+            "plugin": PLUGIN,
+            "replication_slot": REPLICATION_SLOT,
+            "publication": PUBLICATION,
+            "initial_waiting_seconds": 300,
+            "lsn_commit_behaviour": "After loading Data in the destination"
+        }
+    if method not in REPLICATION_METHODS:
+        raise Exception(f"Unknown replication method: {method} (expected one of {', '.join(REPLICATION_METHODS)})")
+    return {
+        "method": method
+    }
+
+
+def build_postgres_source_config(workspace_id: str, name: str = "dvd_rental",
+                                 replication_method: str = "Standard", overrides: Dict = None) -> Dict:
+    """Build the request body for creating the PostgreSQL source (overrides replace configuration keys)."""
+    source_config = {
+        "name": name,
+        "workspaceId": workspace_id,
+        "definitionId": POSTGRES_SOURCE_DEFINITION_ID,
+        "configuration": {
+            "host": "host.docker.internal",
+            "port": 5433,
+            "database": "dvd_rental",
+            "username": "postgres",
+            "password": "postgres",
+            "ssl_mode": {
+                "mode": "disable"
+            },
+            "replication_method": build_replication_method(replication_method),
+            "tunnel_method": {
+                "tunnel_method": "NO_TUNNEL"
+            }
+        }
+    }
+    source_config["configuration"].update(overrides or {})
+    return source_config
+
+
+def build_databricks_destination_config(
+    workspace_id: str,
+    host: str,
+    http_path: str,
+    token: str,
+    catalog: str,
+    schema: str,
+    name: str = "Databricks"
+) -> Dict:
+    """Build the request body for creating the Databricks destination."""
+    return {
+        "name": name,
+        "workspaceId": workspace_id,
+        "definitionId": DATABRICKS_DESTINATION_DEFINITION_ID,
+        "configuration": {
+            "accept_terms": True,
+            "hostname": host,
+            "http_path": http_path,
+            "port": "443",
+            "database": catalog,
+            "schema": schema,
+            "authentication": {
+                "auth_type": "BASIC",
+                "personal_access_token": token
+            }
+        }
+    }
+
+
+def parse_discovered_catalog(result: Dict) -> Dict:
+    """Extract the catalog from a discover response."""
+    # The result might be nested differently depending on API version
+    catalog = result.get("catalog", result.get("catalogDiff", {}).get("transforms", []))
+    if not isinstance(catalog, dict):
+        # If catalog is a list, it might be the transforms array
+        catalog = {"streams": []}
+    catalog.setdefault("streams", [])
+    return catalog
+
+
+def choose_sync_mode(stream: Dict, primary_key: List[List[str]], cursor_fields: Dict[str, str] = None) -> Dict:
+    """
+    Pick the sync policy for a stream: Incremental | Append + Dedup when it has a cursor
+    field and supports incremental syncs, otherwise Full Refresh | Overwrite.
+    """
+    stream_name = stream.get("name")
+    cursor_field = (cursor_fields or {}).get(stream_name)
+    supported_modes = stream.get("supportedSyncModes", ["full_refresh"])
+    
+    # CDC sources define their own cursor (the WAL position)
+    if stream.get("sourceDefinedCursor") and "incremental" in supported_modes and primary_key:
+        return {
+            "syncMode": "incremental",
+            "destinationSyncMode": "append_dedup"
+        }
+    
+    if cursor_field:
+        properties = stream.get("jsonSchema", {}).get("properties")
+        has_cursor = not properties or cursor_field in properties
+        
+        if "incremental" in supported_modes and primary_key and has_cursor:
+            return {
+                "syncMode": "incremental",
+                "destinationSyncMode": "append_dedup",
+                "cursorField": [cursor_field]
+            }
+        print(f"  {stream_name}: incremental sync on {cursor_field} not supported, using full refresh")
+    
+    return {
+        "syncMode": "full_refresh",
+        "destinationSyncMode": "overwrite"
+    }
+
+
+def build_configured_streams(
+    catalog: Dict,
+    primary_keys: Dict[str, List[str]] = None,
+    cursor_fields: Dict[str, str] = None
+) -> List[Dict]:
+    """Configure all discovered streams that have a primary key."""
+    configured_streams = []
+    for stream in catalog.get("streams", []):
+        stream_name = stream.get("name")
+        namespace = stream.get("namespace", "public")
+        
+        # Determine primary key
+        primary_key = []
+        if primary_keys and stream_name in primary_keys:
+            # Use provided primary keys
+            primary_key = [[key] for key in primary_keys[stream_name]]
+        elif stream.get("sourceDefinedPrimaryKey"):
+            # Use source-defined primary keys
+            primary_key = stream.get("sourceDefinedPrimaryKey", [])
+        
+        # Skip views (tables without primary keys) for simplicity
+        # You can enable them by removing this check
+        if not primary_key:
+            print(f"  Skipping {stream_name} (no primary key - likely a view)")
+            continue
+        
+        # Incremental | Append + Dedup where a cursor is configured, else Full Refresh | Overwrite
+        sync_mode = choose_sync_mode(stream, primary_key, cursor_fields)
+        configured_stream = {
+            "stream": {
+                "name": stream_name,
+                "namespace": namespace,
+                "jsonSchema": stream.get("jsonSchema", {}),
+                "supportedSyncModes": stream.get("supportedSyncModes", ["full_refresh"]),
+                "sourceDefinedPrimaryKey": primary_key,
+            },
+            "config": {
+                "selected": True,
+                **sync_mode,
+                "primaryKey": primary_key,
+                "aliasName": stream_name
+            }
+        }
+        
+        configured_streams.append(configured_stream)
+    
+    return configured_streams
+
+
+def build_connection_config(
+    source_id: str,
+    destination_id: str,
+    configured_streams: Optional[List[Dict]] = None,
+    name: str = "dvd_rental → Databricks"
+) -> Dict:
+    """Build the request body for creating a manually scheduled connection."""
+    connection_config = {
+        "name": name,
+        "sourceId": source_id,
+        "destinationId": destination_id,
+        "schedule": {
+            "scheduleType": "manual"
+        },
+        "status": "active",
+        "dataResidency": "auto"
+    }
+    if configured_streams is not None:
+        connection_config["configurations"] = {
+            "streams": configured_streams
+        }
+    return connection_config
+
 
 class AirbyteClient:
     """Client for interacting with Airbyte API."""
     
     def __init__(self, base_url: str, username: str = None, password: str = None, api_key: str = None, 
-                 workspace_id: str = None, client_id: str = None, client_secret: str = None):
+                 workspace_id: str = None, client_id: str = None, client_secret: str = None,
+                 catalog_cache: CatalogCache = None):
         self.base_url = base_url.rstrip("/")
         self.username = username
         self.password = password
@@ -22,32 +235,37 @@ class AirbyteClient:
         self.client_id = client_id
         self.client_secret = client_secret
         self.workspace_id = workspace_id
-        self.session = requests.Session()
+        # Timeouts, retries with backoff and a circuit breaker on every call
+        self.session = RetryingSession()
         self.access_token = None
+
+        # Per-endpoint latency and status metrics, exported at exit when enabled
+        self.metrics = instrument_from_env(self.session)
         
-    def _refresh_token(self) -> bool:
-        """Refresh the access token using client credentials."""
-        if not (self.client_id and self.client_secret):
-            return False
+        # Discovered catalogs are reused across runs while the source configuration is unchanged
+        self.catalog_cache = catalog_cache
+        self._source_configurations: Dict[str, Dict] = {}
         
-        try:
-            token_response = requests.post(
+        # Client credentials tokens are cached and refreshed only when close to expiry
+        self.token_manager = None
+        if client_id and client_secret:
+            self.token_manager = TokenManager(
                 f"{self.base_url.replace('/api/public', '/api')}/v1/applications/token",
-                headers={"Content-Type": "application/json"},
-                json={
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret
-                }
+                client_id,
+                client_secret,
+                session=self.session
             )
-            
-            if token_response.status_code == 200:
-                data = token_response.json()
-                self.access_token = data.get("access_token")
-                if self.access_token:
-                    self.session.headers.update({"Authorization": f"Bearer {self.access_token}"})
-                    return True
-        except Exception as e:
-            print(f"⚠ Token refresh failed: {e}")
+        
+    def _refresh_token(self) -> bool:
+        """Get an access token using client credentials (reuses the cached token while valid)."""
+        if not self.token_manager:
+            return False
+        
+        self.access_token = self.token_manager.get_token()
+        if self.access_token:
+            # Every request on the session now carries a current token and retries once on 401
+            self.session.auth = BearerTokenAuth(self.token_manager)
+            return True
         return False
         
     def authenticate(self) -> None:
@@ -181,14 +399,14 @@ class AirbyteClient:
         raise Exception("No authentication method provided. Please provide either API key or username/password.")
         
     def get_headers(self, include_auth: bool = True, refresh_token: bool = True) -> Dict[str, str]:
-        """Get headers for API requests. Optionally refresh token before request."""
+        """Get headers for API requests. Optionally make sure the cached token is still valid."""
         headers = {
             "Content-Type": "application/json"
         }
     
-        # Refresh token if using client credentials (tokens expire after 3 minutes)
-        if refresh_token and self.client_id and self.client_secret:
-            self._refresh_token()
+        # Tokens expire after 3 minutes; the token manager only refreshes when close to expiry
+        if refresh_token and self.token_manager:
+            self.access_token = self.token_manager.get_token()
         
         # If we have a token, use Bearer auth; otherwise rely on session.auth (basic auth)
         if include_auth and self.access_token:
@@ -210,7 +428,8 @@ class AirbyteClient:
         response = self.session.post(
             f"{self.base_url}/v1/workspaces/list",
             headers=self.get_headers(),
-            json={}
+            json={},
+            idempotent=True
         )
         response.raise_for_status()
         workspaces = response.json().get("workspaces", [])
@@ -222,41 +441,20 @@ class AirbyteClient:
         print(f"✓ Using workspace: {self.workspace_id}")
         return self.workspace_id
     
-    def create_postgres_source(self) -> str:
+    def create_postgres_source(self, replication_method: str = "Standard", name: str = "dvd_rental",
+                               overrides: Dict = None) -> str:
         """Create PostgreSQL source connector."""
-        # Use hardcoded Postgres source definition ID (standard across Airbyte)
-        # This avoids the forbidden source_definitions endpoint
-        postgres_def = "decd338e-5647-4c0b-adf4-da0e75f5a750"
-        
-        source_config = {
-            "name": "dvd_rental",
-            "workspaceId": self.workspace_id,
-            "definitionId": postgres_def,
-            "configuration": {
-                "host": "host.docker.internal",
-                "port": 5433,
-                "database": "dvd_rental",
-                "username": "postgres",
-                "password": "postgres",
-                "ssl_mode": {
-                    "mode": "disable"
-                },
-                "replication_method": {
-                    "method": "Standard"
-                },
-                "tunnel_method": {
-                    "tunnel_method": "NO_TUNNEL"
-                }
-            }
-        }
+        source_config = build_postgres_source_config(
+            self.workspace_id, name=name, replication_method=replication_method, overrides=overrides
+        )
         
-        response = self.session.post(
+        result = create_with_retry(
+            self.session,
             f"{self.base_url}/v1/sources",
+            lambda: self._find_created("sources", name=name),
             headers=self.get_headers(),
             json=source_config
         )
-        response.raise_for_status()
-        result = response.json()
         source_id = result.get("sourceId") or result.get("id")
         print(f"✓ Created PostgreSQL source: {source_id}")
         return source_id
@@ -267,67 +465,106 @@ class AirbyteClient:
         http_path: str,
         token: str,
         catalog: str,
-        schema: str
+        schema: str,
+        name: str = "Databricks"
     ) -> str:
         """Create Databricks destination connector."""
-        # Use hardcoded Databricks destination definition ID (standard across Airbyte)
-        databricks_def = "072d5540-f236-4294-ba7c-ade8fd918496"
-        
-        destination_config = {
-            "name": "Databricks",
-            "workspaceId": self.workspace_id,
-            "definitionId": databricks_def,
-            "configuration": {
-                "accept_terms": True,
-                "hostname": host,
-                "http_path": http_path,
-                "port": "443",
-                "database": catalog,
-                "schema": schema,
-                "authentication": {
-                    "auth_type": "BASIC",
-                    "personal_access_token": token
-                }
-            }
-        }
+        destination_config = build_databricks_destination_config(
+            self.workspace_id, host, http_path, token, catalog, schema, name=name
+        )
         
-        response = self.session.post(
+        result = create_with_retry(
+            self.session,
             f"{self.base_url}/v1/destinations",
+            lambda: self._find_created("destinations", name=name),
             headers=self.get_headers(),
             json=destination_config
         )
-        response.raise_for_status()
-        result = response.json()
         destination_id = result.get("destinationId") or result.get("id")
         print(f"✓ Created Databricks destination: {destination_id}")
         return destination_id
     
-    def get_source_schema(self, source_id: str) -> Dict:
-        """Discover schema from source."""
+    def update_source_configuration(self, source_id: str, configuration: Dict) -> None:
+        """Replace an existing source's configuration."""
+        response = self.session.patch(
+            f"{self.base_url}/v1/sources/{source_id}",
+            headers=self.get_headers(),
+            json={"configuration": configuration},
+            idempotent=True
+        )
+        response.raise_for_status()
+        # Cached catalogs are keyed by the configuration, which just changed
+        self._source_configurations.pop(source_id, None)
+        print(f"✓ Updated source configuration: {source_id}")
+    
+    def update_destination_configuration(self, destination_id: str, configuration: Dict) -> None:
+        """Replace an existing destination's configuration."""
+        response = self.session.patch(
+            f"{self.base_url}/v1/destinations/{destination_id}",
+            headers=self.get_headers(),
+            json={"configuration": configuration},
+            idempotent=True
+        )
+        response.raise_for_status()
+        print(f"✓ Updated destination configuration: {destination_id}")
+    
+    def get_source(self, source_id: str) -> Dict:
+        """Get a source's details, including its configuration."""
+        response = self.session.get(
+            f"{self.base_url}/v1/sources/{source_id}",
+            headers=self.get_headers()
+        )
+        response.raise_for_status()
+        source = response.json()
+        self._source_configurations[source_id] = source.get("configuration", {})
+        return source
+    
+    def _source_configuration(self, source_id: str) -> Dict:
+        """Get a source's configuration (fetched once per run)."""
+        if source_id not in self._source_configurations:
+            self.get_source(source_id)
+        return self._source_configurations[source_id]
+    
+    def get_cached_catalog(self, source_id: str) -> Optional[Dict]:
+        """Return the locally cached catalog for a source, if it is still valid."""
+        if not self.catalog_cache:
+            return None
+        return self.catalog_cache.get(source_id, self._source_configuration(source_id))
+    
+    def cache_catalog(self, source_id: str, catalog: Dict) -> None:
+        """Store a discovered catalog in the local cache."""
+        if self.catalog_cache and catalog.get("streams"):
+            self.catalog_cache.put(source_id, self._source_configuration(source_id), catalog)
+    
+    def get_source_schema(self, source_id: str, refresh: bool = False) -> Dict:
+        """Discover schema from source, reusing the cached catalog unless refresh is set."""
+        if not refresh:
+            catalog = self.get_cached_catalog(source_id)
+            if catalog:
+                print(f"✓ Using cached catalog ({len(catalog['streams'])} tables)")
+                return catalog
+        
         print("⟳ Discovering schema from PostgreSQL source...")
         
         # Try using the discover endpoint with workspaceId
+        # Discovery is read-only (safe to retry) but can take minutes on large schemas
         response = self.session.post(
             f"{self.base_url}/v1/sources/discover",
             headers=self.get_headers(),
             json={
                 "sourceId": source_id,
-                "disable_cache": False
-            }
+                "disable_cache": refresh
+            },
+            timeout=DISCOVER_TIMEOUT,
+            idempotent=True
         )
         response.raise_for_status()
         result = response.json()
         
-        # The result might be nested differently depending on API version
-        catalog = result.get("catalog", result.get("catalogDiff", {}).get("transforms", []))
-        if isinstance(catalog, dict):
-            streams = catalog.get("streams", [])
-        else:
-            # If catalog is a list, it might be the transforms array
-            streams = []
-            catalog = {"streams": streams}
+        catalog = parse_discovered_catalog(result)
+        self.cache_catalog(source_id, catalog)
         
-        print(f"✓ Discovered {len(streams)} tables")
+        print(f"✓ Discovered {len(catalog['streams'])} tables")
         return catalog
     
     def create_connection_with_streams(
@@ -335,74 +572,25 @@ class AirbyteClient:
         source_id: str,
         destination_id: str,
         catalog: Dict,
-        primary_keys: Dict[str, List[str]] = None
+        primary_keys: Dict[str, List[str]] = None,
+        cursor_fields: Dict[str, str] = None,
+        name: str = "dvd_rental → Databricks"
     ) -> str:
         """Create connection between source and destination with configured streams."""
-        
-        # Configure all discovered streams
-        configured_streams = []
-        for stream in catalog.get("streams", []):
-            stream_name = stream.get("name")
-            namespace = stream.get("namespace", "public")
-            
-            # Determine primary key
-            primary_key = []
-            if primary_keys and stream_name in primary_keys:
-                # Use provided primary keys
-                primary_key = [[key] for key in primary_keys[stream_name]]
-            elif stream.get("sourceDefinedPrimaryKey"):
-                # Use source-defined primary keys
-                primary_key = stream.get("sourceDefinedPrimaryKey", [])
-            
-            # Skip views (tables without primary keys) for simplicity
-            # You can enable them by removing this check
-            if not primary_key:
-                print(f"  Skipping {stream_name} (no primary key - likely a view)")
-                continue
-            
-            # Configure stream with Full Refresh | Overwrite
-            configured_stream = {
-                "stream": {
-                    "name": stream_name,
-                    "namespace": namespace,
-                    "jsonSchema": stream.get("jsonSchema", {}),
-                    "supportedSyncModes": stream.get("supportedSyncModes", ["full_refresh"]),
-                    "sourceDefinedPrimaryKey": primary_key,
-                },
-                "config": {
-                    "selected": True,
-                    "syncMode": "full_refresh",
-                    "destinationSyncMode": "overwrite",
-                    "primaryKey": primary_key,
-                    "aliasName": stream_name
-                }
-            }
-            
-            configured_streams.append(configured_stream)
-        
+        configured_streams = build_configured_streams(catalog, primary_keys, cursor_fields)
         print(f"✓ Configured {len(configured_streams)} streams")
         
-        connection_config = {
-            "name": "dvd_rental → Databricks",
-            "sourceId": source_id,
-            "destinationId": destination_id,
-            "configurations": {
-                "streams": configured_streams
-            },
-            "schedule": {
-                "scheduleType": "manual"
-            },
-            "status": "active",
-            "dataResidency": "auto"
-        }
+        connection_config = build_connection_config(source_id, destination_id, configured_streams, name=name)
         
-        response = self.session.post(
+        result = create_with_retry(
+            self.session,
             f"{self.base_url}/v1/connections",
+            lambda: self._find_created(
+                "connections", name=name, sourceId=source_id, destinationId=destination_id
+            ),
             headers=self.get_headers(),
             json=connection_config
         )
-        response.raise_for_status()
-        result = response.json()
         connection_id = result.get("connectionId") or result.get("id")
         print(f"✓ Created connection: {connection_id}")
         return connection_id
@@ -411,50 +599,11 @@ class AirbyteClient:
         self,
         connection_id: str,
         catalog: Dict,
-        primary_keys: Dict[str, List[str]] = None
+        primary_keys: Dict[str, List[str]] = None,
+        cursor_fields: Dict[str, str] = None
     ) -> None:
         """Update an existing connection with configured streams."""
-        
-        # Configure all discovered streams
-        configured_streams = []
-        for stream in catalog.get("streams", []):
-            stream_name = stream.get("name")
-            namespace = stream.get("namespace", "public")
-            
-            # Determine primary key
-            primary_key = []
-            if primary_keys and stream_name in primary_keys:
-                # Use provided primary keys
-                primary_key = [[key] for key in primary_keys[stream_name]]
-            elif stream.get("sourceDefinedPrimaryKey"):
-                # Use source-defined primary keys
-                primary_key = stream.get("sourceDefinedPrimaryKey", [])
-            
-            # Skip views (tables without primary keys)
-            if not primary_key:
-                print(f"  Skipping {stream_name} (no primary key - likely a view)")
-                continue
-            
-            # Configure stream with Full Refresh | Overwrite
-            configured_stream = {
-                "stream": {
-                    "name": stream_name,
-                    "namespace": namespace,
-                    "jsonSchema": stream.get("jsonSchema", {}),
-                    "supportedSyncModes": stream.get("supportedSyncModes", ["full_refresh"]),
-                    "sourceDefinedPrimaryKey": primary_key,
-                },
-                "config": {
-                    "selected": True,
-                    "syncMode": "full_refresh",
-                    "destinationSyncMode": "overwrite",
-                    "primaryKey": primary_key,
-                    "aliasName": stream_name
-                }
-            }
-            
-            configured_streams.append(configured_stream)
-        
+        configured_streams = build_configured_streams(catalog, primary_keys, cursor_fields)
         print(f"✓ Configured {len(configured_streams)} streams")
         
         # Update connection with streams
@@ -464,10 +613,12 @@ class AirbyteClient:
             }
         }
         
+        # The full stream configuration is sent, so repeating the patch is harmless
         response = self.session.patch(
             f"{self.base_url}/v1/connections/{connection_id}",
             headers=self.get_headers(),
-            json=update_config
+            json=update_config,
+            idempotent=True
         )
         response.raise_for_status()
         print(f"✓ Updated connection with streams: {connection_id}")
@@ -475,23 +626,105 @@ class AirbyteClient:
     def trigger_sync(self, connection_id: str) -> str:
         """Trigger a manual sync for the connection using the Jobs API."""
         # According to https://reference.airbyte.com/reference/createjob
-        response = self.session.post(
+        # A sync that is already running was probably started by a failed attempt
+        result = create_with_retry(
+            self.session,
             f"{self.base_url}/v1/jobs",
+            lambda: self._find_running_job_payload(connection_id),
             headers=self.get_headers(),
             json={
                 "connectionId": connection_id,
                 "jobType": "sync"
             }
         )
-        response.raise_for_status()
-        result = response.json()
         job_id = result.get("jobId") or result.get("job", {}).get("id")
         print(f"✓ Triggered sync job: {job_id}")
         return job_id
+    
+    def get_job(self, job_id: str) -> Dict:
+        """Get a job's status, duration and synced rows/bytes."""
+        response = self.session.get(
+            f"{self.base_url}/v1/jobs/{job_id}",
+            headers=self.get_headers()
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def find_running_job(self, connection_id: str) -> Optional[str]:
+        """Get the ID of the sync job currently running for a connection, if any."""
+        response = self.session.get(
+            f"{self.base_url}/v1/jobs",
+            headers=self.get_headers(),
+            params={"connectionId": connection_id, "status": "running", "limit": 1}
+        )
+        response.raise_for_status()
+        jobs = response.json().get("data", [])
+        return str(jobs[0]["jobId"]) if jobs else None
+    
+    def _find_running_job_payload(self, connection_id: str) -> Optional[Dict]:
+        """The running job of a connection in the shape returned by the create job call."""
+        job_id = self.find_running_job(connection_id)
+        return {"jobId": job_id} if job_id else None
+    
+    def _find_created(self, resource: str, **match) -> Optional[Dict]:
+        """Find a resource whose fields equal `match` (used to check whether a failed create was applied)."""
+        for item in iter_resources(self, resource):
+            if all(item.get(key) == value for key, value in match.items()):
+                return item
+        return None
+    
+    def get_job_stream_stats(self, job_id: str) -> List[Dict]:
+        """
+        Get per-stream records/bytes emitted by the latest attempt of a job.
+        Only the internal config API exposes these, so an empty list is returned if it is unavailable.
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url.replace('/api/public', '/api')}/v1/jobs/get",
+                headers=self.get_headers(),
+                json={"id": int(job_id)},
+                idempotent=True
+            )
+            if response.status_code != 200:
+                return []
+            attempts = response.json().get("attempts", [])
+        except (requests.exceptions.RequestException, ValueError):
+            return []
+        
+        if not attempts:
+            return []
+        stream_stats = attempts[-1].get("attempt", {}).get("streamStats", [])
+        return [
+            {
+                "stream": stream.get("streamName"),
+                "records": (stream.get("stats") or {}).get("recordsEmitted", 0),
+                "bytes": (stream.get("stats") or {}).get("bytesEmitted", 0)
+            }
+            for stream in stream_stats
+        ]
 
 
-def main():
-    """Main setup function."""
+def main(argv: Optional[List[str]] = None):
+    """Main setup function (argv defaults to the command line)."""
+    
+    parser = argparse.ArgumentParser(description="Configure Airbyte for PostgreSQL → Databricks ingestion.")
+    parser.add_argument(
+        "--refresh-catalog",
+        action="store_true",
+        help="Ignore the locally cached source catalog and run schema discovery again"
+    )
+    parser.add_argument(
+        "--no-catalog-cache",
+        action="store_true",
+        help="Do not read or write the local source catalog cache"
+    )
+    parser.add_argument(
+        "--replication-method",
+        choices=REPLICATION_METHODS,
+        default=os.getenv("AIRBYTE_REPLICATION_METHOD", "Standard"),
+        help="How the Postgres source reads changes: Standard (table scans), Xmin, or CDC (logical replication)"
+    )
+    args = parser.parse_args(argv)
     
     # Configuration
     AIRBYTE_URL = os.getenv("AIRBYTE_URL", "http://localhost:8000/api")
@@ -527,22 +760,36 @@ def main():
         "store": ["store_id"]
     }
     
+    # Cursor fields for incremental syncs of the large transactional tables.
+    # Other tables are small and keep Full Refresh | Overwrite.
+    # Payments are append-only and have no last_update column, so use payment_date.
+    CURSOR_FIELDS = {
+        "rental": "last_update",
+        "payment": "payment_date",
+        "inventory": "last_update",
+        "film_actor": "last_update"
+    }
+    
     print("=" * 60)
     print("Airbyte Setup: PostgreSQL → Databricks")
     print("=" * 60)
     
+    catalog_cache = None if args.no_catalog_cache else CatalogCache()
+    
     try:
         # Initialize client with Client Credentials or Access Token
         if CLIENT_ID and CLIENT_SECRET:
             client = AirbyteClient(
                 AIRBYTE_URL,
                 client_id=CLIENT_ID,
-                client_secret=CLIENT_SECRET
+                client_secret=CLIENT_SECRET,
+                catalog_cache=catalog_cache
             )
         elif ACCESS_TOKEN:
             client = AirbyteClient(
                 AIRBYTE_URL,
-                api_key=ACCESS_TOKEN
+                api_key=ACCESS_TOKEN,
+                catalog_cache=catalog_cache
             )
         else:
             raise Exception("Please provide either CLIENT_ID/CLIENT_SECRET or ACCESS_TOKEN")
@@ -558,25 +805,36 @@ def main():
         print("Checking existing resources...")
         print("=" * 60)
         
+        # Index existing resources once (paginated) for direct lookups
+        sources = ResourceIndex.build(client, "sources")
+        dests = ResourceIndex.build(client, "destinations")
+        conns = ResourceIndex.build(client, "connections")
+        print(f"✓ Found {len(sources)} sources, {len(dests)} destinations, {len(conns)} connections")
+        
         # Check existing sources
-        sources_response = client.session.get(
-            f"{client.base_url}/v1/sources?workspaceId={client.workspace_id}"
-        )
-        sources = sources_response.json().get("data", []) if sources_response.status_code == 200 else []
-        postgres_source = next((s for s in sources if "dvd_rental" in s.get("name", "").lower()), None)
+        postgres_source = sources.find("dvd_rental")
+        
+        if args.replication_method == "CDC":
+            # Replication slot and publication must exist before the source is created
+            from postgres_cdc import setup_cdc
+            setup_cdc(list(PRIMARY_KEYS))
         
         if postgres_source:
             source_id = postgres_source["sourceId"]
             print(f"✓ Found existing PostgreSQL source: {source_id}")
+            
+            current_method = client.get_source(source_id).get("configuration", {}).get("replication_method", {}).get("method")
+            if current_method and current_method != args.replication_method:
+                print(f"⚠ Existing source uses {current_method} replication, not {args.replication_method}.")
+                print("  Update the source in the Airbyte UI (and reset the connection) to switch methods.")
         else:
-            source_id = client.create_postgres_source()
+            source_id = client.create_postgres_source(replication_method=args.replication_method)
+        
+        if catalog_cache and args.refresh_catalog:
+            catalog_cache.invalidate(source_id)
         
         # Check existing destinations  
-        dests_response = client.session.get(
-            f"{client.base_url}/v1/destinations?workspaceId={client.workspace_id}"
-        )
-        dests = dests_response.json().get("data", []) if dests_response.status_code == 200 else []
-        databricks_dest = next((d for d in dests if d.get("destinationType") == "databricks"), None)
+        databricks_dest = dests.get_by_type("databricks")
         
         if databricks_dest:
             destination_id = databricks_dest["destinationId"]
@@ -595,21 +853,15 @@ def main():
         print("Setting up connection...")
         print("=" * 60)
         
-        conns_response = client.session.get(
-            f"{client.base_url}/v1/connections?workspaceId={client.workspace_id}"
-        )
-        conns = conns_response.json().get("data", []) if conns_response.status_code == 200 else []
-        existing_conn = next((c for c in conns if c.get("sourceId") == source_id and c.get("destinationId") == destination_id), None)
+        existing_conn = conns.get_by_endpoints(source_id, destination_id)
         
         if existing_conn:
             connection_id = existing_conn["connectionId"]
             print(f"✓ Found existing connection: {connection_id}")
         else:
-            # First, discover schema from source
-            print("⟳ Discovering schema from PostgreSQL source...")
-            
+            # First, discover schema from source (or reuse the cached catalog)
             try:
-                catalog = client.get_source_schema(source_id)
+                catalog = client.get_source_schema(source_id, refresh=args.refresh_catalog)
                 
                 # Create connection with configured streams
                 print("⟳ Creating connection with streams...")
@@ -617,7 +869,8 @@ def main():
                     source_id=source_id,
                     destination_id=destination_id,
                     catalog=catalog,
-                    primary_keys=PRIMARY_KEYS
+                    primary_keys=PRIMARY_KEYS,
+                    cursor_fields=CURSOR_FIELDS
                 )
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code == 403:
@@ -626,16 +879,7 @@ def main():
                     
                     # Create a basic connection without streams
                     # We'll configure streams via the web catalog endpoint
-                    connection_config = {
-                        "name": "dvd_rental → Databricks",
-                        "sourceId": source_id,
-                        "destinationId": destination_id,
-                        "schedule": {
-                            "scheduleType": "manual"
-                        },
-                        "status": "active",
-                        "dataResidency": "auto"
-                    }
+                    connection_config = build_connection_config(source_id, destination_id)
                     
                     response = client.session.post(
                         f"{client.base_url}/v1/connections",
@@ -665,34 +909,41 @@ def main():
             sync_catalog = connection_data.get("syncCatalog", {})
             if not sync_catalog.get("streams"):
                 # No streams configured, need to discover and configure
-                print("  No streams configured. Triggering schema refresh...")
-                
-                # Refresh the schema for this connection (this triggers discovery)
-                refresh_response = client.session.post(
-                    f"{client.base_url}/v1/sources/{source_id}/discover",
-                    headers=client.get_headers(),
-                    json={"sourceId": source_id, "connectionId": connection_id}
-                )
+                catalog = client.get_cached_catalog(source_id)
                 
-                if refresh_response.status_code == 200:
-                    catalog_data = refresh_response.json()
-                    catalog = catalog_data.get("catalog", {})
+                if catalog:
+                    print(f"  ✓ Using cached catalog ({len(catalog['streams'])} streams)")
+                else:
+                    print("  No streams configured. Triggering schema refresh...")
+                    
+                    # Refresh the schema for this connection (this triggers discovery)
+                    refresh_response = client.session.post(
+                        f"{client.base_url}/v1/sources/{source_id}/discover",
+                        headers=client.get_headers(),
+                        json={"sourceId": source_id, "connectionId": connection_id}
+                    )
                     
+                    if refresh_response.status_code == 200:
+                        catalog = parse_discovered_catalog(refresh_response.json())
+                        client.cache_catalog(source_id, catalog)
+                        if catalog.get("streams"):
+                            print(f"  ✓ Discovered {len(catalog['streams'])} streams")
+                    else:
+                        print(f"  ⚠ Schema refresh returned {refresh_response.status_code}")
+                        print("  Please configure streams manually in the Airbyte UI:")
+                        print(f"  http://localhost:8000/workspaces/{client.workspace_id}/connections/{connection_id}")
+                
+                if catalog is not None:
                     if catalog.get("streams"):
-                        print(f"  ✓ Discovered {len(catalog['streams'])} streams")
-                        
                         # Now update connection with streams
                         client.update_connection_streams(
                             connection_id=connection_id,
                             catalog=catalog,
-                            primary_keys=PRIMARY_KEYS
+                            primary_keys=PRIMARY_KEYS,
+                            cursor_fields=CURSOR_FIELDS
                         )
                     else:
                         print("  ⚠ No streams found in catalog")
-                else:
-                    print(f"  ⚠ Schema refresh returned {refresh_response.status_code}")
-                    print("  Please configure streams manually in the Airbyte UI:")
-                    print(f"  http://localhost:8000/workspaces/{client.workspace_id}/connections/{connection_id}")
             else:
                 print(f"  ✓ Connection already has {len(sync_catalog['streams'])} streams configured")
                 
@@ -0,0 +1,147 @@
+"""
+Access token management for the Airbyte API.
+Caches the application access token with its expiry so it is only refreshed
+when it is about to expire, instead of before every API call.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.auth import AuthBase
+from requests.hooks import dispatch_hook
+
+
+# Airbyte application tokens expire after 3 minutes
+DEFAULT_TOKEN_LIFETIME = 180
+
+# Refresh the token this many seconds before it actually expires (at most half
+# of its lifetime, so that short-lived tokens are still usable once fetched)
+REFRESH_MARGIN = 30
+
+
+def _no_auth(request: requests.PreparedRequest) -> requests.PreparedRequest:
+    """Leave a request untouched (keeps the session's bearer auth off the token endpoint)."""
+    return request
+
+
+class TokenManager:
+    """Thread-safe cache for an Airbyte application access token."""
+
+    def __init__(self, token_url: str, client_id: str, client_secret: str,
+                 session: requests.Session = None, refresh_margin: float = REFRESH_MARGIN):
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.session = session or requests.Session()
+        self.refresh_margin = refresh_margin
+        self.refresh_count = 0
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        """Whether the cached token is still valid outside the refresh margin."""
+        return self._token is not None and time.monotonic() < self._refresh_at
+
+    def _fetch(self) -> None:
+        """Request a new access token using client credentials. Caller must hold the lock."""
+        try:
+            response = self.session.post(
+                self.token_url,
+                headers={"Content-Type": "application/json"},
+                json={
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret
+                },
+                auth=_no_auth
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                token = data.get("access_token")
+                if token:
+                    lifetime = float(data.get("expires_in") or DEFAULT_TOKEN_LIFETIME)
+                    self._token = token
+                    self._expires_at = time.monotonic() + lifetime
+                    self._refresh_at = self._expires_at - min(self.refresh_margin, lifetime / 2)
+                    self.refresh_count += 1
+                    return
+            print(f"⚠ Token refresh failed: {response.status_code} - {response.text}")
+        except requests.exceptions.RequestException as e:
+            print(f"⚠ Token refresh failed: {e}")
+
+    def get_token(self) -> Optional[str]:
+        """Return a valid access token, refreshing it only when it is close to expiry."""
+        if self._is_fresh():
+            return self._token
+
+        with self._lock:
+            # Another thread may have refreshed the token while we waited for the lock
+            if not self._is_fresh():
+                self._fetch()
+            return self._token if self._is_fresh() else None
+
+    def invalidate(self, stale_token: Optional[str] = None) -> None:
+        """
+        Drop the cached token so the next call refreshes it.
+        If stale_token is given, only drop it if it is still the cached one, so that
+        concurrent callers hitting the same 401 trigger a single refresh.
+        """
+        with self._lock:
+            if stale_token is None or stale_token == self._token:
+                self._token = None
+                self._expires_at = 0.0
+                self._refresh_at = 0.0
+
+    @property
+    def expires_in(self) -> float:
+        """Seconds until the cached token expires (0 if there is none)."""
+        if self._token is None:
+            return 0.0
+        return max(0.0, self._expires_at - time.monotonic())
+
+
+class BearerTokenAuth(AuthBase):
+    """Attach the managed bearer token to each request and retry once on a 401."""
+
+    def __init__(self, token_manager: TokenManager):
+        self.token_manager = token_manager
+
+    def __call__(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        token = self.token_manager.get_token()
+        if token:
+            request.headers["Authorization"] = f"Bearer {token}"
+        request.register_hook("response", self._retry_on_unauthorized)
+        return request
+
+    def _retry_on_unauthorized(self, response: requests.Response, **kwargs) -> requests.Response:
+        """Refresh the token and resend the request once if the server rejected it."""
+        if response.status_code != 401 or getattr(response.request, "_token_retried", False):
+            return response
+
+        sent = response.request.headers.get("Authorization", "")
+        self.token_manager.invalidate(sent.removeprefix("Bearer ") or None)
+        token = self.token_manager.get_token()
+        if not token:
+            return response
+
+        # The request's other response hooks (e.g. HTTP metrics) only see the
+        # response this hook returns, so hand them the rejected attempt first
+        other_hooks = [hook for hook in response.request.hooks["response"] if hook != self._retry_on_unauthorized]
+        dispatch_hook("response", {"response": other_hooks}, response, **kwargs)
+
+        # Consume the body so the connection can be released back to the pool
+        response.content
+        response.close()
+
+        retry_request = response.request.copy()
+        retry_request.headers["Authorization"] = f"Bearer {token}"
+        retry_request._token_retried = True
+
+        retry_response = response.connection.send(retry_request, **kwargs)
+        retry_response.history.append(response)
+        retry_response.request = retry_request
+        return retry_response
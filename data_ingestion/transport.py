@@ -0,0 +1,222 @@
+"""
+Resilient HTTP transport for the Airbyte API.
+Adds per-call timeouts, bounded exponential retry with Retry-After handling and a
+circuit breaker to a requests.Session. Create calls are only re-sent after checking
+that the failed attempt did not already create the resource.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+import requests
+
+
+# (connect, read) timeout in seconds applied to every call that does not set one
+DEFAULT_TIMEOUT = (10, 60)
+
+# Statuses worth retrying: throttling and transient server/gateway errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods that can be re-sent without side effects
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 30.0
+
+# Longest Retry-After we are willing to honour before giving up on the call
+MAX_RETRY_AFTER = 120.0
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Raised instead of calling the API while the circuit breaker is open. A
+    ConnectionError, so callers handling request failures report it like one.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling the API after repeated consecutive failures.
+    After `cooldown` seconds one trial call is let through: success closes the
+    circuit again, failure re-opens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if calls are currently blocked."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            remaining = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(
+                f"Airbyte API circuit open after {self.failures} consecutive failures; "
+                f"retry in {remaining:.0f}s"
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+def retry_after_seconds(response: Optional[requests.Response]) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = MAX_BACKOFF) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_unsent_error(error: Exception) -> bool:
+    """True if the request never reached the server, so even a create is safe to re-send."""
+    return isinstance(error, requests.exceptions.ConnectTimeout)
+
+
+class RetryingSession(requests.Session):
+    """
+    requests.Session with default timeouts, retries and a circuit breaker.
+
+    Idempotent calls (GET/PUT/DELETE, or any call made with idempotent=True) are retried
+    on connection errors, timeouts and RETRY_STATUSES. Other calls (POST/PATCH) are only
+    retried when the server certainly did not act on them: 429 responses and connect
+    timeouts. Use create_with_retry() for create calls.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 breaker: Optional[CircuitBreaker] = None):
+        super().__init__()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+
+    def request(self, method, url, *args, idempotent: Optional[bool] = None, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            response, error = None, None
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success()
+                return response
+
+            # Throttling means the server is healthy, so it does not count towards the breaker
+            if error is not None or response.status_code >= 500:
+                self.breaker.record_failure()
+
+            retryable = (
+                idempotent
+                or (response is not None and response.status_code == 429)
+                or (error is not None and is_unsent_error(error))
+            )
+            delay = retry_after_seconds(response)
+            if not retryable or attempt >= self.max_retries or (delay or 0) > MAX_RETRY_AFTER:
+                if error is not None:
+                    raise error
+                return response
+
+            if delay is None:
+                delay = backoff_delay(attempt)
+            reason = f"HTTP {response.status_code}" if response is not None else type(error).__name__
+            print(f"⚠ {method.upper()} {url} failed ({reason}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+            attempt += 1
+
+
+def create_with_retry(
+    session: requests.Session,
+    url: str,
+    find_existing: Callable[[], Optional[Dict]],
+    max_retries: int = MAX_RETRIES,
+    **kwargs
+) -> Dict:
+    """
+    POST a create call and return the created resource.
+    If an attempt fails in a way that leaves its outcome unknown (timeout, dropped
+    connection, 5xx), find_existing() is asked whether the resource was created anyway
+    before the call is sent again, so retries never create duplicates.
+    """
+    attempt = 0
+    while True:
+        response, error = None, None
+        try:
+            response = session.post(url, **kwargs)
+        except CircuitOpenError:
+            # Nothing was sent, and checking for the resource would be blocked too
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+
+        if error is None and response.status_code < 500:
+            response.raise_for_status()
+            return response.json()
+
+        if attempt >= max_retries:
+            if error is not None:
+                raise error
+            response.raise_for_status()
+
+        delay = retry_after_seconds(response)
+        if delay is None or delay > MAX_RETRY_AFTER:
+            delay = backoff_delay(attempt)
+        reason = f"HTTP {response.status_code}" if response is not None else type(error).__name__
+        print(f"⚠ POST {url} failed ({reason}), checking whether it was applied...")
+        time.sleep(delay)
+
+        existing = find_existing()
+        if existing:
+            print("✓ Found the resource created by the failed attempt; not re-sending")
+            return existing
+        attempt += 1
@@ -1,45 +1,44 @@
 """
-Trigger a manual sync for an existing Airbyte connection.
-Usage: python trigger_sync.py [connection_name_or_id]
+Trigger manual syncs for existing Airbyte connections.
+Usage: python trigger_sync.py [connection_name_or_id_or_glob ...] [--all] [--wait]
 Auto-discovers workspace and connection IDs from Airbyte API.
 """
 
+import argparse
+import fnmatch
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
 import requests
+from requests.adapters import HTTPAdapter
+from job_waiter import exit_code_for, print_job_summary, wait_for_job
+from resource_index import ResourceIndex
 from setup_airbyte import AirbyteClient
 
 
-def find_connection(client: AirbyteClient, name_or_id: str = None) -> tuple[str, str]:
+def find_connection(client: AirbyteClient, name_or_id: str = None,
+                    connections: ResourceIndex = None) -> tuple[str, str]:
     """
     Find connection ID by name or ID.
     If name_or_id is None, returns the first active connection.
+    Pass a prebuilt connections index to reuse it across lookups.
     Returns (connection_id, connection_name).
     """
     try:
-        # List all connections in the workspace
-        response = client.session.get(
-            f"{client.base_url}/v1/connections",
-            headers=client.get_headers(),
-            params={"workspaceId": client.workspace_id}
-        )
-        response.raise_for_status()
-        connections = response.json().get("data", [])
+        # Index all connections in the workspace (paginated)
+        if connections is None:
+            connections = ResourceIndex.build(client, "connections")
         
         if not connections:
             raise Exception("No connections found in workspace")
         
-        # If specific name/ID provided, search for it
+        # If specific name/ID provided, search for it (exact ID, exact name, then partial name)
         if name_or_id:
-            # Try exact ID match first
-            for conn in connections:
-                if conn.get("connectionId") == name_or_id:
-                    return conn["connectionId"], conn.get("name", "Unknown")
-            
-            # Try name match (case-insensitive, partial match)
-            for conn in connections:
-                if name_or_id.lower() in conn.get("name", "").lower():
-                    return conn["connectionId"], conn.get("name", "Unknown")
+            conn = connections.find(name_or_id)
+            if conn:
+                return conn["connectionId"], conn.get("name", "Unknown")
             
             raise Exception(f"No connection found matching: {name_or_id}")
         
@@ -49,24 +48,150 @@ def find_connection(client: AirbyteClient, name_or_id: str = None) -> tuple[str,
                 return conn["connectionId"], conn.get("name", "Unknown")
         
         # If no active connection, use the first one
-        first_conn = connections[0]
+        first_conn = next(iter(connections))
         return first_conn["connectionId"], first_conn.get("name", "Unknown")
         
     except requests.exceptions.HTTPError as e:
         raise Exception(f"Failed to list connections: {e}")
 
 
+def select_connections(client: AirbyteClient, identifiers: List[str], all_active: bool,
+                       connections: ResourceIndex) -> List[Dict]:
+    """
+    Resolve connection names, IDs and glob patterns (e.g. "tenant_*") to connections.
+    With all_active, selects every active connection; with nothing given, the first active one.
+    """
+    if all_active:
+        selected = [conn for conn in connections if conn.get("status") == "active"]
+        if not selected:
+            raise Exception("No active connections found in workspace")
+        return selected
+    
+    if not identifiers:
+        connection_id, _ = find_connection(client, None, connections)
+        return [connections.get(connection_id)]
+    
+    selected = {}
+    for identifier in identifiers:
+        if any(char in identifier for char in "*?["):
+            pattern = identifier.lower()
+            matches = [
+                conn for conn in connections
+                if fnmatch.fnmatch(conn.get("name", "").lower(), pattern)
+                or fnmatch.fnmatch(conn.get("connectionId", ""), identifier)
+            ]
+            if not matches:
+                raise Exception(f"No connection found matching: {identifier}")
+        else:
+            connection_id, _ = find_connection(client, identifier, connections)
+            matches = [connections.get(connection_id)]
+        
+        # Keep the first occurrence of each connection, in the order given
+        for conn in matches:
+            selected.setdefault(conn["connectionId"], conn)
+    
+    return list(selected.values())
+
+
+def start_sync(client: AirbyteClient, connection: Dict, reuse_running: bool = True) -> Optional[str]:
+    """
+    Start a sync for a connection and return its job ID.
+    If a sync is already running (409), returns that job's ID when reuse_running is set,
+    so callers wait for the running job instead; otherwise None.
+    """
+    connection_id = connection["connectionId"]
+    label = connection.get("name", connection_id)
+    
+    try:
+        job_id = client.trigger_sync(connection_id)
+        print(f"[{label}] ✓ Sync started: job {job_id}")
+        return job_id
+    except requests.exceptions.HTTPError as e:
+        # A 409 conflict means a job is already running for this connection
+        if e.response is None or e.response.status_code != 409:
+            raise
+    
+    print(f"[{label}] ⚠ A sync is already running for this connection")
+    if not reuse_running:
+        return None
+    job_id = client.find_running_job(connection_id)
+    if not job_id:
+        print(f"[{label}] ⚠ Could not find the running job to wait for")
+    return job_id
+
+
+def trigger_connection(client: AirbyteClient, connection: Dict, args: argparse.Namespace) -> int:
+    """
+    Trigger (and optionally wait for) one connection's sync. Returns its exit code.
+    Any error is reported with the connection's label and returns 1, so that one
+    connection cannot abort the others running in parallel.
+    """
+    label = connection.get("name", connection["connectionId"])
+    
+    try:
+        # Wait for an already running job instead, so downstream steps see its data
+        job_id = start_sync(client, connection, reuse_running=args.wait)
+    except requests.exceptions.HTTPError as e:
+        print(f"[{label}] ✗ Error: {e}")
+        if e.response is not None:
+            print(f"[{label}] Response: {e.response.text}")
+        return 1
+    except Exception as e:
+        print(f"[{label}] ✗ Error: {e}")
+        return 1
+    
+    if not job_id or not args.wait:
+        return 0
+    
+    try:
+        job = wait_for_job(
+            client,
+            job_id,
+            timeout=args.timeout,
+            initial_interval=args.poll_interval,
+            max_interval=args.max_poll_interval,
+            label=label
+        )
+        print_job_summary(client, job_id, job, label=label)
+        return exit_code_for(job)
+    except Exception as e:
+        print(f"[{label}] ✗ Error while waiting for job {job_id}: {e}")
+        return 1
+
+
 def main():
-    """Trigger a sync for a connection."""
+    """Trigger syncs for one or more connections."""
+    
+    parser = argparse.ArgumentParser(description="Trigger manual syncs for Airbyte connections.")
+    parser.add_argument(
+        "connections",
+        nargs="*",
+        metavar="connection",
+        help="Connection names, IDs or glob patterns such as 'tenant_*' (default: first active connection)"
+    )
+    parser.add_argument("--all", action="store_true", help="Trigger every active connection")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=8,
+        help="Maximum number of connections triggered/waited on concurrently (default: 8)"
+    )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Wait for the sync jobs to finish and exit with a code reflecting their status "
+             "(0 succeeded, 1 failed, 2 cancelled, 3 timed out; the worst status wins)"
+    )
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds to wait for each job (default: 3600)")
+    parser.add_argument("--poll-interval", type=float, default=5, help="Initial seconds between polls (default: 5)")
+    parser.add_argument("--max-poll-interval", type=float, default=60, help="Maximum seconds between polls (default: 60)")
+    args = parser.parse_args()
     
     # Configuration
     AIRBYTE_URL = os.getenv("AIRBYTE_URL", "http://localhost:8000/api")
     CLIENT_ID = os.getenv("AIRBYTE_CLIENT_ID")
     CLIENT_SECRET = os.getenv("AIRBYTE_CLIENT_SECRET")
     
-    # Optional: specify connection by name or ID via command line
-    connection_identifier = sys.argv[1] if len(sys.argv) >= 2 else None
-    
     try:
         # Initialize client (workspace will be auto-discovered)
         client = AirbyteClient(
@@ -74,6 +199,10 @@ def main():
             client_id=CLIENT_ID,
             client_secret=CLIENT_SECRET
         )
+        # One pooled connection per worker so concurrent calls reuse connections
+        adapter = HTTPAdapter(pool_maxsize=max(args.max_in_flight, 1))
+        client.session.mount("http://", adapter)
+        client.session.mount("https://", adapter)
         client.authenticate()
         
         # Auto-discover workspace if not set
@@ -82,36 +211,36 @@ def main():
         
         print(f"✓ Using workspace: {client.workspace_id}")
         
-        # Auto-discover connection
-        connection_id, connection_name = find_connection(client, connection_identifier)
-        print(f"✓ Found connection: {connection_name} ({connection_id})")
-        
-        # Trigger sync
-        print(f"\n🔄 Triggering sync...")
-        job_id = client.trigger_sync(connection_id)
-        print(f"✓ Sync started successfully!")
-        print(f"Job ID: {job_id}")
-        print(f"\nMonitor at: http://localhost:8000/workspaces/{client.workspace_id}/connections/{connection_id}")
+        # Auto-discover connections
+        connections = ResourceIndex.build(client, "connections")
+        if not connections:
+            raise Exception("No connections found in workspace")
+        selected = select_connections(client, args.connections, args.all, connections)
+        for conn in selected:
+            print(f"✓ Found connection: {conn.get('name', 'Unknown')} ({conn['connectionId']})")
         
     except requests.exceptions.HTTPError as e:
-        # Check if it's a 409 conflict (job already running)
-        is_409 = False
+        print(f"\n✗ Error: {e}")
         if hasattr(e, 'response') and e.response is not None:
-            is_409 = e.response.status_code == 409
-        elif "409" in str(e):
-            is_409 = True
-        
-        if is_409:
-            print(f"\n⚠ A sync is already running for this connection")
-            sys.exit(0)
-        else:
-            print(f"\n✗ Error: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"Response: {e.response.text}")
+            print(f"Response: {e.response.text}")
         sys.exit(1)
     except Exception as e:
         print(f"\n✗ Error: {e}")
         sys.exit(1)
+    
+    # Trigger all selected connections in parallel; failures are reported per connection
+    print(f"\n🔄 Triggering {len(selected)} sync(s) (max {args.max_in_flight} in flight)...")
+    with ThreadPoolExecutor(max_workers=max(args.max_in_flight, 1)) as pool:
+        exit_codes = list(pool.map(lambda conn: trigger_connection(client, conn, args), selected))
+    
+    print("\n" + "=" * 60)
+    for conn, code in zip(selected, exit_codes):
+        icon = "✓" if code == 0 else "✗"
+        print(f"{icon} {conn.get('name', 'Unknown')} ({conn['connectionId']}): exit {code}")
+    print("=" * 60)
+    print(f"\nMonitor at: http://localhost:8000/workspaces/{client.workspace_id}/connections")
+    
+    sys.exit(max(exit_codes))
 
 
 if __name__ == "__main__":
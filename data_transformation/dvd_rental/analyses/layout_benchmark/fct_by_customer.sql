@@ -0,0 +1,8 @@
+-- Layout benchmark: one customer's rental history (Z-order on customer_id)
+select
+    rental_id,
+    rental_date,
+    film_id,
+    payment_amount
+from {{ ref('fct_rental') }}
+where customer_id = 148
@@ -0,0 +1,9 @@
+-- Layout benchmark: one month of facts (partition pruning on fct_rental)
+select
+    store_id,
+    count(*) as rentals,
+    sum(actual_payment) as revenue
+from {{ ref('fct_rental') }}
+where rental_year = 2005
+  and rental_month = 7
+group by store_id
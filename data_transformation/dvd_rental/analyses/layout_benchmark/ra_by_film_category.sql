@@ -0,0 +1,9 @@
+-- Layout benchmark: one film category by month
+select
+    rental_year,
+    rental_month,
+    count(*) as rentals,
+    sum(total_revenue) as revenue
+from {{ ref('rental_analytics') }}
+where film_category = 'Action'
+group by rental_year, rental_month
@@ -0,0 +1,9 @@
+-- Layout benchmark: one month of rentals (rental_date range filter)
+select
+    rental_date,
+    count(*) as rentals,
+    sum(total_revenue) as revenue
+from {{ ref('rental_analytics') }}
+where rental_date >= '2005-07-01'
+  and rental_date < '2005-08-01'
+group by rental_date
@@ -0,0 +1,8 @@
+-- Layout benchmark: one store's rentals by film category
+select
+    film_category,
+    count(*) as rentals,
+    sum(total_revenue) as revenue
+from {{ ref('rental_analytics') }}
+where store_id = 1
+group by film_category
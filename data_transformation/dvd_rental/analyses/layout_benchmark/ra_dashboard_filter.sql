@@ -0,0 +1,12 @@
+-- Layout benchmark: typical dashboard slice combining all three BI filters
+select
+    return_status,
+    count(*) as rentals,
+    sum(total_revenue) as revenue,
+    avg(actual_rental_days) as avg_rental_days
+from {{ ref('rental_analytics') }}
+where rental_date >= '2005-07-01'
+  and rental_date < '2005-08-01'
+  and store_id = 2
+  and film_category in ('Comedy', 'Drama')
+group by return_status
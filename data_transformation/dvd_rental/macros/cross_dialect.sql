@@ -0,0 +1,92 @@
+{#
+    Databricks SQL functions the models use that DuckDB (the local target) spells
+    or numbers differently. The default implementation is the Databricks SQL the
+    models were written in; duckdb__ versions are picked by adapter.dispatch when
+    running with --target local.
+#}
+
+{# Whole days elapsed between two dates/timestamps #}
+{% macro day_diff(start_date, end_date) -%}
+    {{ return(adapter.dispatch('day_diff', 'dvd_rental')(start_date, end_date)) }}
+{%- endmacro %}
+
+{% macro default__day_diff(start_date, end_date) -%}
+    datediff(day, {{ start_date }}, {{ end_date }})
+{%- endmacro %}
+
+{% macro duckdb__day_diff(start_date, end_date) -%}
+    date_sub('day', {{ start_date }}, {{ end_date }})
+{%- endmacro %}
+
+
+{# Day of week numbered 1 (Sunday) to 7 (Saturday) #}
+{% macro day_of_week(column) -%}
+    {{ return(adapter.dispatch('day_of_week', 'dvd_rental')(column)) }}
+{%- endmacro %}
+
+{% macro default__day_of_week(column) -%}
+    extract(dayofweek from {{ column }})
+{%- endmacro %}
+
+{% macro duckdb__day_of_week(column) -%}
+    (extract(dayofweek from {{ column }}) + 1)
+{%- endmacro %}
+
+
+{#
+    date_format with a Databricks (Java) pattern. The DuckDB version translates
+    the pattern letters used here (yyyy, MMMM, MM, dd, EEEE, QQQ) to strftime.
+#}
+{% macro format_date(column, pattern) -%}
+    {{ return(adapter.dispatch('format_date', 'dvd_rental')(column, pattern)) }}
+{%- endmacro %}
+
+{% macro default__format_date(column, pattern) -%}
+    date_format({{ column }}, '{{ pattern }}')
+{%- endmacro %}
+
+{% macro duckdb__format_date(column, pattern) -%}
+    {%- set letters = [('yyyy', '%Y'), ('MMMM', '%B'), ('MM', '%m'), ('dd', '%d'), ('EEEE', '%A')] -%}
+    {%- set parts = [] -%}
+    {%- for piece in pattern.split('QQQ') -%}
+        {%- if not loop.first -%}
+            {%- do parts.append("'Q' || quarter(" ~ column ~ ")") -%}
+        {%- endif -%}
+        {%- if piece -%}
+            {%- set ns = namespace(format=piece) -%}
+            {%- for java, strftime in letters -%}
+                {%- set ns.format = ns.format.replace(java, strftime) -%}
+            {%- endfor -%}
+            {%- do parts.append("strftime(" ~ column ~ ", '" ~ ns.format ~ "')") -%}
+        {%- endif -%}
+    {%- endfor -%}
+    ({{ parts | join(' || ') }})
+{%- endmacro %}
+
+
+{# One row per day from start_date to end_date (inclusive), as a select expression #}
+{% macro date_sequence(start_date, end_date) -%}
+    {{ return(adapter.dispatch('date_sequence', 'dvd_rental')(start_date, end_date)) }}
+{%- endmacro %}
+
+{% macro default__date_sequence(start_date, end_date) -%}
+    explode(sequence({{ start_date }}, {{ end_date }}, interval 1 day))
+{%- endmacro %}
+
+{% macro duckdb__date_sequence(start_date, end_date) -%}
+    cast(unnest(generate_series({{ start_date }}, {{ end_date }}, interval 1 day)) as date)
+{%- endmacro %}
+
+
+{# Sorted array of the distinct values of an expression (aggregate) #}
+{% macro sorted_distinct_array(expression) -%}
+    {{ return(adapter.dispatch('sorted_distinct_array', 'dvd_rental')(expression)) }}
+{%- endmacro %}
+
+{% macro default__sorted_distinct_array(expression) -%}
+    array_sort(collect_set({{ expression }}))
+{%- endmacro %}
+
+{% macro duckdb__sorted_distinct_array(expression) -%}
+    list_sort(list(distinct {{ expression }}) filter (where {{ expression }} is not null))
+{%- endmacro %}
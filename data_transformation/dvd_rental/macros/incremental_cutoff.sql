@@ -0,0 +1,13 @@
+{#
+    Lower bound for the rows an incremental run reprocesses: the latest value of
+    `column` already in the model, minus a lookback window so that late-arriving
+    rows (e.g. payments recorded after the rental was loaded) are picked up again.
+    Only valid inside an is_incremental() block.
+#}
+{% macro incremental_cutoff(column, lookback_days=none) -%}
+    {%- set days = lookback_days if lookback_days is not none else var('incremental_lookback_days') -%}
+    (
+        select coalesce(max({{ column }}), cast('1900-01-01' as timestamp)) - interval {{ days }} days
+        from {{ this }}
+    )
+{%- endmacro %}
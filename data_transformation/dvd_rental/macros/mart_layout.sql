@@ -0,0 +1,13 @@
+{#
+    Returns a physical layout setting (partition_by, zorder, liquid_clustered_by)
+    unless the mart_layout var is false, so the marts can be rebuilt as plain
+    Delta tables to benchmark the layout against:
+
+        dbt run --full-refresh --select marts --vars '{mart_layout: false}'
+#}
+{% macro mart_layout(value) -%}
+    {%- if var('mart_layout', true) | string | lower == 'false' -%}
+        {{ return(none) }}
+    {%- endif -%}
+    {{ return(value) }}
+{%- endmacro %}
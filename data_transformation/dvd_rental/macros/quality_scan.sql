@@ -0,0 +1,92 @@
+{#
+    Single-pass data-quality scan (run_dbt.py --quality-scan). Evaluates all the
+    column- and row-level tests of a relation in one aggregated query instead of
+    one query per test, then logs the failing rows per test and raises if a test
+    with error severity failed.
+
+    `relations` is built from the manifest by data_transformation/quality_scan.py:
+    [{name, relation, assertions: [{name, test, severity, column, ...test arguments}]}]
+#}
+{% macro quality_scan(relations) %}
+    {%- set failed = [] -%}
+    {%- set warned = [] -%}
+    {%- for relation in relations -%}
+        {%- set query -%}
+            select
+            {%- for assertion in relation.assertions %}
+                {{ quality_scan_failures(assertion) }} as failures_{{ loop.index }}{{ ',' if not loop.last }}
+            {%- endfor %}
+            from {{ relation.relation }}
+        {%- endset -%}
+
+        {%- set started = modules.datetime.datetime.now() -%}
+        {%- set row = run_query(query).rows[0] -%}
+        {%- set seconds = (modules.datetime.datetime.now() - started).total_seconds() -%}
+
+        {%- set failing = [] -%}
+        {%- for assertion in relation.assertions -%}
+            {%- set failures = row[loop.index0] | int -%}
+            {%- if failures -%}
+                {%- do failing.append((assertion, failures)) -%}
+                {%- do (warned if assertion.severity == 'warn' else failed).append(assertion.name) -%}
+            {%- endif -%}
+        {%- endfor -%}
+
+        {{ log(('✗ ' if failing else '✓ ') ~ relation.name ~ ": " ~ relation.assertions | length ~ " tests, "
+               ~ failing | length ~ " failing (" ~ '%.2f' | format(seconds) ~ "s)", info=True) }}
+        {%- for assertion, failures in failing %}
+            {{ log(('  ⚠ ' if assertion.severity == 'warn' else '  ✗ ') ~ assertion.name ~ ": "
+                   ~ failures ~ " failing rows", info=True) }}
+        {%- endfor -%}
+    {%- endfor -%}
+
+    {%- if warned -%}
+        {{ log("⚠ " ~ warned | length ~ " tests with warn severity failed", info=True) }}
+    {%- endif -%}
+    {%- if failed -%}
+        {{ exceptions.raise_compiler_error(failed | length ~ " data-quality tests failed: " ~ failed | join(', ')) }}
+    {%- endif -%}
+{% endmacro %}
+
+
+{#
+    Aggregate counting the rows that fail one test, with the same semantics as
+    the test itself (nulls pass every test but not_null). For unique it counts
+    the surplus rows of duplicated values; for a singular test (fails_when) the
+    rows its query would return.
+#}
+{% macro quality_scan_failures(assertion) -%}
+    {%- set column = assertion.column -%}
+    {%- if assertion.test == 'not_null' -%}
+        count(case when {{ column }} is null then 1 end)
+    {%- elif assertion.test == 'unique' -%}
+        (count({{ column }}) - count(distinct {{ column }}))
+    {%- elif assertion.test == 'accepted_values' -%}
+        {%- set values = [] -%}
+        {%- for value in assertion['values'] -%}
+            {%- do values.append("'" ~ value ~ "'" if assertion.get('quote', true) else value) -%}
+        {%- endfor -%}
+        count(case when {{ column }} not in ({{ values | join(', ') }}) then 1 end)
+    {%- elif assertion.test == 'accepted_range' -%}
+        {%- set inclusive = assertion.get('inclusive', true) -%}
+        {%- set conditions = [] -%}
+        {%- if assertion.get('min_value') is not none -%}
+            {%- do conditions.append(column ~ (' >= ' if inclusive else ' > ') ~ assertion.min_value) -%}
+        {%- endif -%}
+        {%- if assertion.get('max_value') is not none -%}
+            {%- do conditions.append(column ~ (' <= ' if inclusive else ' < ') ~ assertion.max_value) -%}
+        {%- endif -%}
+        {#- Without bounds every row is in range #}
+        {%- if conditions -%}
+            count(case when not ({{ conditions | join(' and ') }}) then 1 end)
+        {%- else -%}
+            0
+        {%- endif -%}
+    {%- elif assertion.test == 'expression_is_true' -%}
+        count(case when not ({{ column ~ ' ' if column }}{{ assertion.expression }}) then 1 end)
+    {%- elif assertion.test == 'fails_when' -%}
+        count(case when {{ assertion.condition }} then 1 end)
+    {%- else -%}
+        {{ exceptions.raise_compiler_error("quality_scan: unsupported test " ~ assertion.test) }}
+    {%- endif -%}
+{%- endmacro %}
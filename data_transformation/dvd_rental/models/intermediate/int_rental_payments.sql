@@ -0,0 +1,26 @@
+{{
+    config(
+        materialized='view',
+        tags=['intermediate']
+    )
+}}
+
+-- Payments aggregated to one row per rental, so facts can join payments
+-- without fanning out when a rental was paid in several installments
+
+with payments as (
+    select * from {{ ref('stg_payment') }}
+),
+
+aggregated as (
+    select
+        rental_id,
+        sum(amount) as total_amount,
+        count(*) as payment_count,
+        min(payment_date) as first_payment_date,
+        max(payment_date) as last_payment_date
+    from payments
+    group by rental_id
+)
+
+select * from aggregated
@@ -1,6 +1,7 @@
 {{
     config(
         materialized='table',
+        liquid_clustered_by=mart_layout(['customer_id']),
         tags=['dimension', 'mart']
     )
 }}
@@ -1,19 +1,46 @@
 {{
     config(
         materialized='table',
+        liquid_clustered_by=mart_layout(['date_day']),
         tags=['dimension', 'mart']
     )
 }}
 
--- Generate a date dimension table from rental and payment dates
-with date_spine as (
-    select distinct date(rental_date) as date_day
-    from {{ ref('stg_rental') }}
-    
-    union
-    
-    select distinct date(payment_date) as date_day
-    from {{ ref('stg_payment') }}
+-- depends_on: {{ ref('stg_rental') }}
+-- depends_on: {{ ref('stg_payment') }}
+
+-- Generate a contiguous date dimension between the earliest and latest rental,
+-- return and payment dates. min/max on the untransformed source columns are
+-- answered from Delta file statistics, so building the spine does not scan the
+-- tables; set the date_spine_start/date_spine_end vars to skip even that.
+with bounds as (
+    {% if var('date_spine_start', none) and var('date_spine_end', none) %}
+    select
+        cast('{{ var("date_spine_start") }}' as date) as start_date,
+        cast('{{ var("date_spine_end") }}' as date) as end_date
+    {% else %}
+    select
+        least(r.min_rental_date, p.min_payment_date) as start_date,
+        greatest(r.max_rental_date, r.max_return_date, p.max_payment_date) as end_date
+    from (
+        select
+            date(min(rental_date)) as min_rental_date,
+            date(max(rental_date)) as max_rental_date,
+            date(max(return_date)) as max_return_date
+        from {{ ref('stg_rental') }}
+    ) r
+    cross join (
+        select
+            date(min(payment_date)) as min_payment_date,
+            date(max(payment_date)) as max_payment_date
+        from {{ ref('stg_payment') }}
+    ) p
+    {% endif %}
+),
+
+date_spine as (
+    select {{ date_sequence('start_date', 'end_date') }} as date_day
+    from bounds
 ),
 
 final as (
@@ -25,26 +52,26 @@ final as (
         extract(month from date_day) as month,
         extract(day from date_day) as day,
         extract(quarter from date_day) as quarter,
-        extract(dayofweek from date_day) as day_of_week,
+        {{ day_of_week('date_day') }} as day_of_week,
         extract(dayofyear from date_day) as day_of_year,
         extract(week from date_day) as week_of_year,
         
         -- Formatted dates
-        date_format(date_day, 'yyyy-MM') as year_month,
-        date_format(date_day, 'yyyy-QQQ') as year_quarter,
+        {{ format_date('date_day', 'yyyy-MM') }} as year_month,
+        {{ format_date('date_day', 'yyyy-QQQ') }} as year_quarter,
         
         -- Day name and month name
-        date_format(date_day, 'EEEE') as day_name,
-        date_format(date_day, 'MMMM') as month_name,
+        {{ format_date('date_day', 'EEEE') }} as day_name,
+        {{ format_date('date_day', 'MMMM') }} as month_name,
         
         -- Business logic flags
         case
-            when extract(dayofweek from date_day) in (1, 7) then true
+            when {{ day_of_week('date_day') }} in (1, 7) then true
             else false
         end as is_weekend,
         
         case
-            when extract(dayofweek from date_day) between 2 and 6 then true
+            when {{ day_of_week('date_day') }} between 2 and 6 then true
             else false
         end as is_weekday,
         
@@ -62,6 +89,5 @@ final as (
 )
 
 select * from final
-order by date_day
 
 
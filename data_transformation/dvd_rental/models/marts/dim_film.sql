@@ -1,6 +1,7 @@
 {{
     config(
         materialized='table',
+        liquid_clustered_by=mart_layout(['film_id']),
         tags=['dimension', 'mart']
     )
 }}
@@ -17,6 +18,19 @@ categories as (
     select * from {{ ref('stg_category') }}
 ),
 
+-- One row per film: the primary (lowest category_id) category plus all of them,
+-- so joining the dimension on film_id never multiplies fact rows
+film_category_lists as (
+    select
+        fc.film_id,
+        min_by(c.category_name, fc.category_id) as category_name,
+        {{ sorted_distinct_array('c.category_name') }} as category_names,
+        count(distinct fc.category_id) as category_count
+    from film_categories fc
+    inner join categories c on fc.category_id = c.category_id
+    group by fc.film_id
+),
+
 final as (
     select
         f.film_id,
@@ -31,7 +45,9 @@ final as (
         f.rating,
         
         -- Category information
-        c.category_name,
+        fcl.category_name,
+        fcl.category_names,
+        coalesce(fcl.category_count, 0) as category_count,
         
         -- Derived attributes
         case
@@ -51,8 +67,7 @@ final as (
         f.last_update as film_last_update
         
     from films f
-    left join film_categories fc on f.film_id = fc.film_id
-    left join categories c on fc.category_id = c.category_id
+    left join film_category_lists fcl on f.film_id = fcl.film_id
 )
 
 select * from final
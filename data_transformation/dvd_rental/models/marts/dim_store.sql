@@ -1,6 +1,7 @@
 {{
     config(
         materialized='table',
+        liquid_clustered_by=mart_layout(['store_id']),
         tags=['dimension', 'mart']
     )
 }}
@@ -1,16 +1,39 @@
 {{
     config(
-        materialized='table',
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key='rental_id',
+        on_schema_change='append_new_columns',
+        partition_by=mart_layout(['rental_year', 'rental_month']),
+        zorder=mart_layout(['customer_id', 'film_id']),
         tags=['fact', 'mart']
     )
 }}
 
+-- depends_on: {{ ref('stg_payment') }}
+
+-- Incremental runs only rebuild rentals updated within the lookback window
+-- and rentals with recent payments (so late payments are merged in)
+
 with rentals as (
     select * from {{ ref('stg_rental') }}
+    {% if is_incremental() %}
+    where last_update >= {{ incremental_cutoff('rental_last_update') }}
+       or rental_id in (
+           select rental_id
+           from {{ ref('stg_payment') }}
+           where payment_date >= {{ incremental_cutoff('payment_date') }}
+       )
+    {% endif %}
 ),
 
+-- One row per rental: installments are pre-aggregated so the join cannot fan out
 payments as (
-    select * from {{ ref('stg_payment') }}
+    select * from {{ ref('int_rental_payments') }}
+    {% if is_incremental() %}
+    -- Only aggregate the payments of the rentals being rebuilt
+    where rental_id in (select rental_id from rentals)
+    {% endif %}
 ),
 
 inventory as (
@@ -33,24 +56,29 @@ final as (
         r.staff_id,
         date(r.rental_date) as rental_date_id,
         date(r.return_date) as return_date_id,
-        date(p.payment_date) as payment_date_id,
+        date(p.last_payment_date) as payment_date_id,
         
         -- Degenerate dimensions (transaction details)
         r.rental_date,
         r.return_date,
-        p.payment_date,
+        p.last_payment_date as payment_date,
+        p.first_payment_date,
         r.inventory_id,
-        p.payment_id,
+        
+        -- Partition columns
+        year(r.rental_date) as rental_year,
+        month(r.rental_date) as rental_month,
         
         -- Measures
-        p.amount as payment_amount,
+        p.total_amount as payment_amount,
+        coalesce(p.payment_count, 0) as payment_count,
         f.rental_rate as expected_amount,
         r.rental_duration_days,
         f.rental_duration as expected_rental_duration,
         
         -- Derived measures
-        coalesce(p.amount, 0) as actual_payment,
-        coalesce(p.amount, 0) - f.rental_rate as payment_variance,
+        coalesce(p.total_amount, 0) as actual_payment,
+        coalesce(p.total_amount, 0) - f.rental_rate as payment_variance,
         
         -- Business flags
         case
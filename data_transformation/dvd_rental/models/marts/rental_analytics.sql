@@ -1,15 +1,24 @@
 {{
     config(
-        materialized='table',
+        materialized='incremental',
+        incremental_strategy='merge',
+        unique_key='rental_id',
+        on_schema_change='append_new_columns',
+        liquid_clustered_by=mart_layout(['rental_date', 'store_id', 'film_category']),
         tags=['bi', 'mart', 'analytics']
     )
 }}
 
 -- Final denormalized table for BI consumption
 -- Combines all dimensions and facts for easy querying
+-- Incremental runs only merge fact rows whose rental or payment changed within the lookback window
 
 with fact_rentals as (
     select * from {{ ref('fct_rental') }}
+    {% if is_incremental() %}
+    where rental_last_update >= {{ incremental_cutoff('rental_last_update') }}
+       or payment_date >= {{ incremental_cutoff('payment_date') }}
+    {% endif %}
 ),
 
 dim_customers as (
@@ -32,7 +41,6 @@ final as (
     select
         -- Fact identifiers
         f.rental_id,
-        f.payment_id,
         f.inventory_id,
         
         -- Customer information
@@ -55,6 +63,7 @@ final as (
         fm.release_year,
         fm.rating as film_rating,
         fm.category_name as film_category,
+        fm.category_names as film_categories,
         fm.length_minutes as film_length_minutes,
         fm.film_length_category,
         fm.rental_rate as film_rental_rate,
@@ -79,10 +88,12 @@ final as (
         
         -- Transaction dates
         f.return_date,
+        f.first_payment_date,
         f.payment_date,
         
         -- Measures
         f.payment_amount,
+        f.payment_count,
         f.expected_amount,
         f.actual_payment,
         f.payment_variance,
@@ -1,6 +1,5 @@
 {{
     config(
-        materialized='view',
         tags=['staging']
     )
 }}
@@ -22,7 +21,7 @@ cleaned as (
         -- Calculate rental duration in days
         case
             when return_date is not null then
-                datediff(day, rental_date, return_date)
+                {{ day_diff('rental_date', 'return_date') }}
             else null
         end as rental_duration_days
         
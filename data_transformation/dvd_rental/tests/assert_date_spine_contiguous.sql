@@ -0,0 +1,9 @@
+-- Test to ensure dim_date has exactly one row per day between its first and last date
+-- This test will fail if the generated spine has gaps or duplicate days
+
+select
+    min(date_day) as first_day,
+    max(date_day) as last_day,
+    count(*) as days
+from {{ ref('dim_date') }}
+having count(*) != {{ day_diff('min(date_day)', 'max(date_day)') }} + 1
@@ -1,11 +1,15 @@
 -- Test to ensure all payment amounts are positive
 -- This test will fail if there are any negative or zero payment amounts
 
+-- Row-level condition, also checked by run_dbt.py --quality-scan
+{% set fails_when = "payment_amount < 0" %}
+{{ config(meta={'quality_scan_fails_when': fails_when}) }}
+
 select
-    payment_id,
+    rental_id,
     customer_id,
-    amount
+    payment_amount
 from {{ ref('fct_rental') }}
-where payment_amount < 0
+where {{ fails_when }}
 
 
@@ -1,12 +1,15 @@
 -- Test to ensure return dates are always after rental dates
 -- This test will fail if any return date is before the rental date
 
+-- Row-level condition, also checked by run_dbt.py --quality-scan
+{% set fails_when = "return_date is not null and return_date < rental_date" %}
+{{ config(meta={'quality_scan_fails_when': fails_when}) }}
+
 select
     rental_id,
     rental_date,
     return_date
 from {{ ref('fct_rental') }}
-where return_date is not null
-  and return_date < rental_date
+where {{ fails_when }}
 
 
@@ -1,6 +1,10 @@
 -- Test to ensure total revenue calculation is consistent
 -- This test will fail if calculated total_revenue doesn't match the sum of components
 
+-- Row-level condition, also checked by run_dbt.py --quality-scan
+{% set fails_when = "abs(total_revenue - (actual_payment + calculated_late_fee)) > 0.01" %}
+{{ config(meta={'quality_scan_fails_when': fails_when}) }}
+
 select
     rental_id,
     actual_payment,
@@ -8,6 +12,6 @@ select
     total_revenue,
     (actual_payment + calculated_late_fee) as calculated_total
 from {{ ref('rental_analytics') }}
-where abs(total_revenue - (actual_payment + calculated_late_fee)) > 0.01
+where {{ fails_when }}
 
 
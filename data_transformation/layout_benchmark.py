@@ -0,0 +1,201 @@
+"""
+Layout benchmark for the Databricks marts.
+Compiles the queries in dvd_rental/analyses/layout_benchmark, runs each one on the
+SQL warehouse with the result cache disabled and records bytes scanned, files
+pruned and timings from the query history. Run it once against marts built without
+layout hints and once with them, then compare:
+
+    dbt run --full-refresh --select marts --vars '{mart_layout: false}'
+    python layout_benchmark.py --label before
+    dbt run --full-refresh --select marts
+    python layout_benchmark.py --label after
+    python layout_benchmark.py --compare before after
+
+Needs DATABRICKS_HOST, DATABRICKS_HTTP_PATH and DATABRICKS_TOKEN (as for dbt).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+from databricks import sql
+from databricks.sdk import WorkspaceClient
+from databricks.sdk.service.sql import QueryFilter
+from dbt.cli.main import dbtRunner
+
+
+PROJECT_DIR = Path(__file__).resolve().parent / "dvd_rental"
+RESULTS_DIR = Path(__file__).resolve().parent / "benchmark_results"
+QUERY_SELECTOR = "path:analyses/layout_benchmark"
+
+# Query history metrics recorded per query
+METRICS = (
+    "read_bytes",
+    "pruned_bytes",
+    "read_files_count",
+    "pruned_files_count",
+    "rows_read_count",
+    "execution_time_ms",
+    "total_time_ms",
+)
+
+# Query metrics can take a few seconds to appear in the history
+HISTORY_TIMEOUT = 120
+HISTORY_POLL_INTERVAL = 5
+
+
+def compile_queries() -> Dict[str, str]:
+    """Compile the benchmark analyses with dbt and return {name: sql}."""
+    result = dbtRunner().invoke([
+        "compile", "--select", QUERY_SELECTOR,
+        "--project-dir", str(PROJECT_DIR), "--profiles-dir", str(PROJECT_DIR),
+        "--no-populate-cache", "--quiet",
+    ])
+    if not result.success:
+        raise Exception(f"dbt compile failed: {result.exception}")
+    queries = {r.node.name: r.node.compiled_code for r in result.result.results}
+    if not queries:
+        raise Exception(f"No benchmark queries found for {QUERY_SELECTOR}")
+    return dict(sorted(queries.items()))
+
+
+def run_queries(queries: Dict[str, str]) -> Dict[str, str]:
+    """Run every query on the warehouse and return {name: query_id}."""
+    query_ids = {}
+    with sql.connect(
+        server_hostname=os.environ["DATABRICKS_HOST"],
+        http_path=os.environ["DATABRICKS_HTTP_PATH"],
+        access_token=os.environ["DATABRICKS_TOKEN"],
+    ) as connection:
+        with connection.cursor() as cursor:
+            # Cached results would report zero bytes scanned
+            cursor.execute("set use_cached_result = false")
+            for name, query in queries.items():
+                start = time.perf_counter()
+                cursor.execute(query)
+                rows = cursor.fetchall()
+                query_ids[name] = cursor.query_id
+                print(f"✓ {name}: {len(rows)} rows in {time.perf_counter() - start:.2f}s")
+    return query_ids
+
+
+def fetch_metrics(query_ids: Dict[str, str]) -> Dict[str, Dict]:
+    """Read the scan metrics of the given queries from the query history."""
+    client = WorkspaceClient(host=os.environ["DATABRICKS_HOST"], token=os.environ["DATABRICKS_TOKEN"])
+    names = {query_id: name for name, query_id in query_ids.items()}
+    metrics = {}
+    deadline = time.monotonic() + HISTORY_TIMEOUT
+
+    while True:
+        history = client.query_history.list(
+            filter_by=QueryFilter(statement_ids=list(query_ids.values())),
+            include_metrics=True,
+            max_results=len(query_ids),
+        )
+        for query in history.res or []:
+            if query.metrics is not None and query.metrics.read_bytes is not None:
+                values = query.metrics.as_dict()
+                metrics[names[query.query_id]] = {key: values.get(key) for key in METRICS}
+        if len(metrics) == len(query_ids) or time.monotonic() >= deadline:
+            break
+        print(f"⟳ Waiting for query metrics ({len(metrics)}/{len(query_ids)})...")
+        time.sleep(HISTORY_POLL_INTERVAL)
+
+    missing = sorted(set(query_ids) - set(metrics))
+    if missing:
+        print(f"⚠ No metrics recorded for: {', '.join(missing)}")
+    return metrics
+
+
+def results_path(label: str) -> Path:
+    return RESULTS_DIR / f"layout_{label}.json"
+
+
+def run_benchmark(label: str) -> Path:
+    """Compile, run and measure the benchmark queries; save the results under `label`."""
+    queries = compile_queries()
+    print(f"Running {len(queries)} benchmark queries...")
+    query_ids = run_queries(queries)
+    metrics = fetch_metrics(query_ids)
+
+    results = {
+        "label": label,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "queries": {
+            name: {"query_id": query_ids[name], **metrics.get(name, {})}
+            for name in queries
+        },
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = results_path(label)
+    path.write_text(json.dumps(results, indent=2) + "\n")
+    return path
+
+
+def format_bytes(value) -> str:
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TB"
+
+
+def _change(before: Dict, after: Dict, key: str) -> str:
+    values = ["-" if run.get(key) is None else str(run[key]) for run in (before, after)]
+    return "→".join(values)
+
+
+def compare(before_label: str, after_label: str) -> List[Dict]:
+    """Print bytes scanned, files read and time per query for two recorded runs."""
+    before = json.loads(results_path(before_label).read_text())["queries"]
+    after = json.loads(results_path(after_label).read_text())["queries"]
+
+    print(f"{'query':<24}{'read ' + before_label:>14}{'read ' + after_label:>14}{'change':>9}"
+          f"{'files':>12}{'time ms':>16}")
+    rows = []
+    for name in sorted(set(before) & set(after)):
+        b, a = before[name], after[name]
+        change = None
+        if b.get("read_bytes") and a.get("read_bytes") is not None:
+            change = (a["read_bytes"] - b["read_bytes"]) / b["read_bytes"] * 100
+        rows.append({"query": name, "before": b, "after": a, "read_bytes_change_pct": change})
+        print(
+            f"{name:<24}{format_bytes(b.get('read_bytes')):>14}{format_bytes(a.get('read_bytes')):>14}"
+            f"{'-' if change is None else f'{change:+.0f}%':>9}"
+            f"{_change(b, a, 'read_files_count'):>12}{_change(b, a, 'total_time_ms'):>16}"
+        )
+    return rows
+
+
+def main():
+    """Run or compare the layout benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Measure bytes scanned by the mart benchmark queries.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--label", help="Run the queries and save the results under this label")
+    group.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two saved runs")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Mart layout benchmark")
+    print("=" * 60)
+
+    try:
+        if args.compare:
+            compare(*args.compare)
+        else:
+            path = run_benchmark(args.label)
+            print(f"✓ Results saved to {path}")
+    except Exception as e:
+        print(f"✗ Benchmark failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Persist dbt's parse artifacts across runs.
+CI runs and containers start from a fresh checkout, so dbt would parse the whole
+project every time. target/partial_parse.msgpack and target/manifest.json are kept
+on disk keyed by a content hash of the project (models/, macros/, dbt_project.yml
+and the dbt version) and restored before dbt parses. On a miss the most recent
+entry is restored instead: dbt's partial parsing then only re-parses changed files.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from dbt.version import __version__ as dbt_version
+
+
+DEFAULT_CACHE_DIR = Path(
+    os.getenv("DBT_PARSE_CACHE_DIR", Path.home() / ".cache" / "elt-project" / "dbt_parse")
+).expanduser()
+
+# Project files that determine the parse result
+KEYED_PATHS = ("models", "macros", "dbt_project.yml")
+
+CACHED_ARTIFACTS = ("partial_parse.msgpack", "manifest.json")
+
+# Entries kept; older ones are removed when a new one is saved
+MAX_ENTRIES = 5
+
+
+def content_hash(project_dir: Path) -> str:
+    """Hash of the file names and contents under KEYED_PATHS, plus the dbt version."""
+    digest = hashlib.sha256(dbt_version.encode("utf-8"))
+    for keyed in KEYED_PATHS:
+        root = project_dir / keyed
+        files = [root] if root.is_file() else sorted(p for p in root.rglob("*") if p.is_file())
+        for path in files:
+            digest.update(str(path.relative_to(project_dir)).encode("utf-8") + b"\0")
+            digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """On-disk cache of dbt parse artifacts, one directory per content hash."""
+
+    def __init__(self, project_dir: Path, cache_dir: Path = DEFAULT_CACHE_DIR, max_entries: int = MAX_ENTRIES):
+        self.project_dir = Path(project_dir)
+        self.target_dir = self.project_dir / "target"
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+
+    def _entries(self):
+        """Complete cache entries, most recently saved first."""
+        if not self.cache_dir.exists():
+            return []
+        entries = [
+            path for path in self.cache_dir.iterdir()
+            if path.is_dir() and all((path / name).exists() for name in CACHED_ARTIFACTS)
+        ]
+        return sorted(entries, key=lambda path: path.stat().st_mtime, reverse=True)
+
+    def restore(self) -> Optional[str]:
+        """
+        Copy cached artifacts into target/ unless it already has a partial parse file.
+        Returns "hit" (same content hash), "stale" (most recent other entry) or None.
+        """
+        if (self.target_dir / "partial_parse.msgpack").exists():
+            return None
+
+        entry = self.cache_dir / content_hash(self.project_dir)
+        status = "hit"
+        if entry not in self._entries():
+            entries = self._entries()
+            if not entries:
+                return None
+            entry, status = entries[0], "stale"
+
+        self.target_dir.mkdir(parents=True, exist_ok=True)
+        for name in CACHED_ARTIFACTS:
+            shutil.copy2(entry / name, self.target_dir / name)
+        return status
+
+    def save(self) -> None:
+        """Store the artifacts of the last parse (written to a temp dir, then renamed into place)."""
+        if not all((self.target_dir / name).exists() for name in CACHED_ARTIFACTS):
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self.cache_dir / content_hash(self.project_dir)
+
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.cache_dir, suffix=".tmp"))
+        try:
+            for name in CACHED_ARTIFACTS:
+                shutil.copy2(self.target_dir / name, tmp_dir / name)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_dir, entry)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        # Mark as most recent (the copies keep the artifacts' own mtimes)
+        os.utime(entry)
+
+        for stale in self._entries()[self.max_entries:]:
+            shutil.rmtree(stale, ignore_errors=True)
@@ -0,0 +1,127 @@
+"""
+Single-pass data-quality scan for the dvd_rental dbt project.
+
+dbt runs every test as its own query, so a relation with fifteen column tests is
+read fifteen times. The scan groups the column- and row-level tests of each
+relation (unique, not_null, accepted_values, dbt_utils.accepted_range and
+dbt_utils.expression_is_true) and evaluates them in one aggregated query per
+relation (macros/quality_scan.sql), reporting the failing rows per test.
+Row-level singular tests are scanned too when they declare the condition of
+their failing rows as meta.quality_scan_fails_when.
+
+Tests that need a join or a group by (relationships, other singular tests), tests
+on ephemeral models and tests with a where, limit or custom failure threshold are
+left to dbt. Used by run_dbt.py --quality-scan.
+"""
+
+import json
+import time
+from typing import Dict, Iterable, List, Optional
+
+from dbt.contracts.graph.manifest import Manifest
+
+
+# (test namespace, test name) -> test kind evaluated by the quality_scan macro
+SCANNED_TESTS = {
+    (None, "unique"): "unique",
+    (None, "not_null"): "not_null",
+    (None, "accepted_values"): "accepted_values",
+    ("dbt_utils", "accepted_range"): "accepted_range",
+    ("dbt_utils", "expression_is_true"): "expression_is_true",
+}
+
+# Meta key of a singular test holding the condition its failing rows match
+FAILS_WHEN_META = "quality_scan_fails_when"
+
+# Test arguments passed on to the macro
+TEST_ARGUMENTS = ("values", "quote", "min_value", "max_value", "inclusive", "expression")
+
+# Failure settings of a test that fails as soon as one row fails
+DEFAULT_FAILURE_CONFIG = ("count(*)", "!= 0", "!= 0")
+
+
+def assertion_for(test) -> Optional[Dict]:
+    """The scan's version of a test node, or None if the test has to run on its own."""
+    # Singular tests have no test metadata
+    metadata = getattr(test, "test_metadata", None)
+    config = test.config
+    if config.where or config.limit or config.store_failures:
+        return None
+    if (config.fail_calc, config.warn_if, config.error_if) != DEFAULT_FAILURE_CONFIG:
+        return None
+
+    if metadata is None:
+        fails_when = config.meta.get(FAILS_WHEN_META)
+        if not fails_when:
+            return None
+        return {
+            "name": test.name,
+            "test": "fails_when",
+            "severity": str(config.severity).lower(),
+            "column": None,
+            "condition": fails_when,
+        }
+
+    if (metadata.namespace, metadata.name) not in SCANNED_TESTS:
+        return None
+    assertion = {
+        "name": test.name,
+        "test": SCANNED_TESTS[(metadata.namespace, metadata.name)],
+        "severity": str(config.severity).lower(),
+        "column": metadata.kwargs.get("column_name"),
+    }
+    assertion.update({key: metadata.kwargs[key] for key in TEST_ARGUMENTS if key in metadata.kwargs})
+    return assertion
+
+
+def scan_plan(manifest: Manifest, test_ids: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Group the scannable tests (all tests by default) by the relation they test:
+    [{name, relation, assertions}], the argument of the quality_scan macro.
+    """
+    relations: Dict[str, Dict] = {}
+    for test_id in test_ids if test_ids is not None else manifest.nodes:
+        test = manifest.nodes[test_id]
+        if test.resource_type != "test":
+            continue
+        assertion = assertion_for(test)
+        parents = test.depends_on.nodes
+        if assertion is None or len(parents) != 1:
+            continue
+
+        parent = manifest.nodes.get(parents[0]) or manifest.sources.get(parents[0])
+        if parent is None or not parent.relation_name:
+            # Ephemeral models have no relation to read
+            continue
+        name = f"{parent.source_name}.{parent.name}" if parent.resource_type == "source" else parent.name
+        relation = relations.setdefault(parent.unique_id, {
+            "name": name, "relation": parent.relation_name, "assertions": []
+        })
+        relation["assertions"].append(assertion)
+    return sorted(relations.values(), key=lambda relation: relation["name"])
+
+
+def scanned_tests(plan: List[Dict]) -> List[str]:
+    """Names of the tests covered by the scan (to exclude them from dbt build/test)."""
+    return [assertion["name"] for relation in plan for assertion in relation["assertions"]]
+
+
+def run_scan(project, plan: List[Dict]) -> bool:
+    """Run the scan through `dbt run-operation` on a run_dbt.DbtProject; returns True if no test failed."""
+    if not plan:
+        print("✓ No tests to scan")
+        return True
+
+    print(f"⟳ Scanning {len(plan)} relations for {len(scanned_tests(plan))} tests...")
+    start = time.perf_counter()
+    # Own target path, so the build's run_results.json is kept for the saved state
+    result = project.invoke([
+        "run-operation", "quality_scan", "--args", json.dumps({"relations": plan}),
+        "--target-path", str(project.project_dir / "target" / "quality_scan"),
+    ])
+    elapsed = time.perf_counter() - start
+    if not result.success:
+        print(f"✗ Data-quality scan failed after {elapsed:.1f}s")
+        return False
+    print(f"✓ Data-quality scan passed in {elapsed:.1f}s")
+    return True
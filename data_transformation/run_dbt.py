@@ -0,0 +1,273 @@
+"""
+Run the dvd_rental dbt project, optionally rebuilding only what changed.
+
+Source freshness (max(_airbyte_extracted_at) per source) is collected before every
+build, and the artifacts of each successful build are kept in the state directory.
+With --changed-only, `dbt build` selects only the models downstream of sources whose
+max value moved since the last successful run (plus models whose code changed).
+Without saved state everything is built.
+
+All dbt commands run in-process and share one parsed manifest; the partial parse
+file and manifest are restored from and saved to a local cache (see parse_cache.py).
+
+With --target local the project builds in DuckDB from the Parquet files written by
+data_ingestion/dump_loader.py (no warehouse needed).
+
+With --quality-scan the column- and row-level tests are taken out of `dbt build`
+and checked after it in one aggregated query per relation (see quality_scan.py).
+
+Usage: python run_dbt.py [--changed-only] [--select SELECTOR ...] [--state-dir DIR] [--full-refresh] [--docs]
+                         [--target local] [--quality-scan]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from dbt.cli.main import dbtRunner, dbtRunnerResult
+from dbt.contracts.graph.manifest import Manifest
+
+from parse_cache import ParseCache
+from quality_scan import run_scan, scan_plan, scanned_tests
+
+
+PROJECT_DIR = Path(__file__).resolve().parent / "dvd_rental"
+TARGET_DIR = PROJECT_DIR / "target"
+
+# Artifacts of the last successful run, compared against by --changed-only
+DEFAULT_STATE_DIR = PROJECT_DIR / "state"
+STATE_ARTIFACTS = ("manifest.json", "sources.json", "run_results.json")
+
+CHANGED_SELECTOR = ["source_status:fresher+", "state:modified+"]
+
+# Selector methods that compare against the saved state
+STATE_METHODS = ("state:", "source_status:")
+
+# Defaults for the local (DuckDB) target; profiles.yml resolves them relative to
+# PROJECT_DIR, which is not the working directory here
+LOCAL_WAREHOUSE_DIR = PROJECT_DIR.parent.parent / "local_warehouse"
+LOCAL_TARGET_ENV = {
+    "DBT_DUCKDB_PATH": LOCAL_WAREHOUSE_DIR / "dvd_rental.duckdb",
+    "DBT_PARQUET_DIR": LOCAL_WAREHOUSE_DIR / "dvd_rental",
+}
+
+
+class DbtProject:
+    """Runs dbt commands in-process against the project, parsing it only once."""
+
+    def __init__(self, project_dir: Path = PROJECT_DIR, parse_cache: Optional[ParseCache] = None,
+                 use_parse_cache: bool = True, target: Optional[str] = None):
+        self.project_dir = project_dir
+        self.parse_cache = parse_cache or (ParseCache(project_dir) if use_parse_cache else None)
+        self.target = target
+        self._runner: Optional[dbtRunner] = None
+        self._manifest: Optional[Manifest] = None
+        for name, default in LOCAL_TARGET_ENV.items():
+            os.environ.setdefault(name, str(default))
+
+    def _args(self, args: List[str]) -> List[str]:
+        args = args + ["--project-dir", str(self.project_dir), "--profiles-dir", str(self.project_dir)]
+        if self.target:
+            args += ["--target", self.target]
+        return args
+
+    def install_packages(self) -> None:
+        """Run dbt deps if packages.yml lists packages that are not installed yet."""
+        if not (self.project_dir / "packages.yml").exists() or (self.project_dir / "dbt_packages").exists():
+            return
+        result = dbtRunner().invoke(["deps", "--quiet", "--project-dir", str(self.project_dir),
+                                     "--profiles-dir", str(self.project_dir)])
+        if not result.success:
+            raise Exception(f"dbt deps failed: {result.exception}")
+        print("✓ Installed dbt packages")
+
+    def parse(self) -> Manifest:
+        """Parse the project (writes target/manifest.json) and keep the manifest for later commands."""
+        self.install_packages()
+        if self.parse_cache is not None:
+            restored = self.parse_cache.restore()
+            if restored:
+                print(f"✓ Restored dbt parse cache ({restored})")
+
+        start = time.perf_counter()
+        result = dbtRunner().invoke(self._args(["parse", "--quiet"]))
+        if not result.success:
+            raise Exception(f"dbt parse failed: {result.exception}")
+        print(f"✓ Parsed project in {time.perf_counter() - start:.1f}s")
+
+        if self.parse_cache is not None:
+            self.parse_cache.save()
+        self._manifest = result.result
+        self._runner = dbtRunner(manifest=result.result)
+        return result.result
+
+    @property
+    def manifest(self) -> Manifest:
+        if self._manifest is None:
+            self.parse()
+        return self._manifest
+
+    @property
+    def adapter_type(self) -> str:
+        """Adapter of the target being built (databricks, duckdb)."""
+        return self.manifest.metadata.adapter_type
+
+    def invoke(self, args: List[str]) -> dbtRunnerResult:
+        if self._runner is None:
+            self.parse()
+        return self._runner.invoke(self._args(args))
+
+    def collect_freshness(self) -> None:
+        """Write target/sources.json. Stale sources are expected (nothing new was loaded)."""
+        result = self.invoke(["source", "freshness"])
+        if result.exception is not None:
+            raise Exception(f"dbt source freshness failed: {result.exception}")
+        if not (TARGET_DIR / "sources.json").exists():
+            raise Exception("dbt source freshness did not write target/sources.json")
+
+    def list_models(self, select: List[str], state_dir: Optional[Path] = None) -> List[str]:
+        """Models matched by the selectors."""
+        args = ["ls", "--resource-type", "model", "--select", *select, "--log-level", "none"]
+        if state_dir is not None:
+            args += ["--state", str(state_dir)]
+        result = self.invoke(args)
+        if not result.success:
+            raise Exception(f"dbt ls failed: {result.exception}")
+        return list(result.result or [])
+
+    def list_tests(self, select: Optional[List[str]] = None, state_dir: Optional[Path] = None) -> List[str]:
+        """Unique IDs of the tests a build of the selectors runs (every test without selectors)."""
+        args = ["ls", "--resource-type", "test", "--output", "json", "--output-keys", "unique_id",
+                "--log-level", "none"]
+        if select:
+            args += ["--select", *select]
+        if state_dir is not None:
+            args += ["--state", str(state_dir)]
+        result = self.invoke(args)
+        if not result.success:
+            raise Exception(f"dbt ls failed: {result.exception}")
+        return [json.loads(line)["unique_id"] for line in result.result or []]
+
+
+def has_state(state_dir: Path) -> bool:
+    return all((state_dir / name).exists() for name in ("manifest.json", "sources.json"))
+
+
+def save_state(state_dir: Path) -> None:
+    """Keep this run's artifacts as the baseline for the next --changed-only run."""
+    state_dir.mkdir(parents=True, exist_ok=True)
+    for name in STATE_ARTIFACTS:
+        if (TARGET_DIR / name).exists():
+            shutil.copy2(TARGET_DIR / name, state_dir / name)
+
+
+def run(changed_only: bool = False, state_dir: Path = DEFAULT_STATE_DIR,
+        full_refresh: bool = False, select: Optional[List[str]] = None,
+        project: Optional[DbtProject] = None, docs: bool = False, quality_scan: bool = False) -> bool:
+    """
+    Build the project, or only the models matched by `select` (--changed-only adds
+    the changed-sources selectors), then optionally generate the docs from the same
+    manifest without compiling again. With quality_scan the scannable tests are
+    excluded from the build and checked after it. Returns True on success.
+    """
+    project = project or DbtProject()
+    args = ["build"]
+    if full_refresh:
+        args.append("--full-refresh")
+
+    if project.adapter_type == "duckdb":
+        # The Parquet sources carry no load timestamps; without sources.json the
+        # source_status selector falls back to building everything
+        print("⚠ Local target: skipping source freshness")
+        (TARGET_DIR / "sources.json").unlink(missing_ok=True)
+    else:
+        print("⟳ Collecting source freshness...")
+        project.collect_freshness()
+
+    selector = list(select or [])
+    if changed_only:
+        selector += CHANGED_SELECTOR
+    uses_state = any(s.startswith(STATE_METHODS) for s in selector)
+    if uses_state and not has_state(state_dir):
+        print(f"⚠ No saved state in {state_dir}, building everything")
+        selector = []
+
+    if selector:
+        selected = project.list_models(selector, state_dir if uses_state else None)
+        if not selected:
+            print("✓ No source or model changed since the last successful run, nothing to build")
+            return True
+        print(f"✓ {len(selected)} models affected by changed sources or code:")
+        for name in selected:
+            print(f"  - {name}")
+        args += ["--select", *selector]
+        if uses_state:
+            args += ["--state", str(state_dir)]
+
+    plan = []
+    if quality_scan:
+        # Folded tests no longer stop the build of downstream models; the build
+        # only counts as successful (and its state is saved) if the scan passes
+        plan = scan_plan(project.manifest, project.list_tests(selector, state_dir if uses_state else None))
+        if plan:
+            args += ["--exclude", *scanned_tests(plan)]
+
+    start = time.perf_counter()
+    result = project.invoke(args)
+    elapsed = time.perf_counter() - start
+    if not result.success:
+        print(f"✗ dbt build failed after {elapsed:.1f}s")
+        return False
+
+    print(f"✓ dbt build succeeded in {elapsed:.1f}s")
+    if quality_scan and not run_scan(project, plan):
+        return False
+    save_state(state_dir)
+
+    if docs:
+        result = project.invoke(["docs", "generate", "--no-compile"])
+        if not result.success:
+            print("✗ dbt docs generate failed")
+            return False
+        print("✓ Documentation generated")
+    return True
+
+
+def main():
+    """Run dbt from the command line."""
+    parser = argparse.ArgumentParser(description="Build the dvd_rental dbt project.")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="Only rebuild models downstream of sources that changed since the last successful run")
+    parser.add_argument("--select", nargs="*", help="Only build these dbt selectors")
+    parser.add_argument("--state-dir",
+                        help="Artifacts of the last successful run (default: state/, state/<target> with --target)")
+    parser.add_argument("--full-refresh", action="store_true", help="Rebuild incremental models from scratch")
+    parser.add_argument("--docs", action="store_true", help="Generate dbt docs after the build")
+    parser.add_argument("--no-parse-cache", action="store_true", help="Do not restore or save the dbt parse cache")
+    parser.add_argument("--target", help="profiles.yml output to build (default: dev, Databricks; local: DuckDB)")
+    parser.add_argument("--quality-scan", action="store_true",
+                        help="Check column/row tests in one query per relation instead of one query per test")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"dbt build: dvd_rental ({args.target or 'default target'})")
+    print("=" * 60)
+
+    try:
+        project = DbtProject(use_parse_cache=not args.no_parse_cache, target=args.target)
+        state_dir = Path(args.state_dir) if args.state_dir else DEFAULT_STATE_DIR / (args.target or "")
+        success = run(args.changed_only, state_dir, args.full_refresh, args.select,
+                      project=project, docs=args.docs, quality_scan=args.quality_scan)
+    except Exception as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Scale-factor benchmark for the dbt models on the local (DuckDB) target.
+For every scale factor the dump is generated (scale_generator.py) and loaded into
+Parquet (dump_loader.py) if not done yet, then the models are rebuilt from scratch
+several times (`dbt run --full-refresh --target local --threads 1`, one child process
+per run, single-threaded so models do not compete for the CPU). Per-model wall time
+comes from run_results.json, rows from the built relations and peak memory from the
+resource usage of each dbt process.
+
+    python scale_benchmark.py --scales 1 10 --label main --save-baseline
+    python scale_benchmark.py --scales 1 10 --label my-change --check
+
+--check compares the fastest run (the minimum over the repetitions, the least noisy
+statistic) of the whole build, of every model taking at least GATED_MODEL_SECONDS
+and the peak memory against the baseline, and exits with status 1 if any of them
+regressed beyond --threshold.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "data_ingestion"))
+
+import duckdb
+from dbt.version import __version__ as dbt_version
+
+from dump_loader import DEFAULT_OUTPUT_DIR, load_dump
+from run_dbt import LOCAL_WAREHOUSE_DIR, PROJECT_DIR, DbtProject
+from scale_generator import generate
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "benchmark_results"
+DEFAULT_BASELINE = RESULTS_DIR / "scale_baseline.json"
+
+# A time regresses when its minimum grows by more than the threshold and by more
+# than MIN_SECONDS; models faster than GATED_MODEL_SECONDS in the baseline are
+# reported but not gated (their times are dominated by noise)
+DEFAULT_THRESHOLD = 0.25
+MIN_SECONDS = 0.5
+GATED_MODEL_SECONDS = 1.0
+
+
+def parquet_dir(scale: int) -> Path:
+    """Parquet copy of the dump at this scale, generated and loaded on first use."""
+    if scale == 1:
+        output_dir = Path(DEFAULT_OUTPUT_DIR)
+        dump_dir = None
+    else:
+        output_dir = LOCAL_WAREHOUSE_DIR / f"dvd_rental_sf{scale}"
+        dump_dir = LOCAL_WAREHOUSE_DIR / f"dvdrental_sf{scale}"
+
+    if (output_dir / "rental.parquet").exists():
+        return output_dir
+    if dump_dir is not None and not (dump_dir / "toc.dat").exists():
+        print(f"⟳ Generating dump at scale factor {scale}...")
+        generate(scale, dump_dir)
+    print(f"⟳ Loading scale factor {scale} into {output_dir}...")
+    if dump_dir is None:
+        load_dump(output_dir=output_dir)
+    else:
+        load_dump(dump_dir, output_dir)
+    return output_dir
+
+
+def run_dbt_process(args: List[str], env: Dict[str, str]) -> Dict:
+    """Run dbt in a child process; returns its exit code and peak resident memory."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "dbt.cli.main", *args],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    stderr = process.stderr.read().decode(errors="replace")
+    process.stderr.close()
+    # ru_maxrss is in kilobytes on Linux
+    return {"exit_code": process.returncode, "peak_rss_mb": usage.ru_maxrss / 1024, "stderr": stderr}
+
+
+def count_rows(database: Path, relations: Dict[str, str]) -> Dict[str, Optional[int]]:
+    """Row count of every built relation ({model: relation_name}); None for ephemerals."""
+    counts = {}
+    with duckdb.connect(str(database), read_only=True) as connection:
+        for model, relation in relations.items():
+            counts[model] = connection.sql(f"select count(*) from {relation}").fetchone()[0] if relation else None
+    return counts
+
+
+def benchmark_scale(scale: int, repetitions: int, select: Optional[List[str]] = None) -> Dict:
+    """Rebuild the models `repetitions` times at one scale factor and collect the timings."""
+    database = LOCAL_WAREHOUSE_DIR / f"benchmark_sf{scale}.duckdb"
+    target_path = PROJECT_DIR / "target" / f"benchmark_sf{scale}"
+    env = dict(os.environ, DBT_PARQUET_DIR=str(parquet_dir(scale)), DBT_DUCKDB_PATH=str(database))
+    args = [
+        "run", "--full-refresh", "--target", "local", "--threads", "1",
+        "--project-dir", str(PROJECT_DIR), "--profiles-dir", str(PROJECT_DIR),
+        "--target-path", str(target_path),
+    ]
+    if select:
+        args += ["--select", *select]
+
+    models: Dict[str, Dict] = {}
+    runs = []
+    for repetition in range(1, repetitions + 1):
+        outcome = run_dbt_process(args, env)
+        if outcome["exit_code"]:
+            raise Exception(f"dbt run failed at scale factor {scale}:\n{outcome['stderr'][-2000:]}")
+        run_results = json.loads((target_path / "run_results.json").read_text())
+        runs.append({"seconds": run_results["elapsed_time"], "peak_rss_mb": outcome["peak_rss_mb"]})
+        for result in run_results["results"]:
+            name = result["unique_id"].split(".")[-1]
+            model = models.setdefault(name, {"relation": result.get("relation_name"), "seconds": []})
+            model["seconds"].append(result["execution_time"])
+        print(f"✓ sf{scale} run {repetition}/{repetitions}: {run_results['elapsed_time']:.2f}s, "
+              f"peak {outcome['peak_rss_mb']:.0f}MB")
+
+    rows = count_rows(database, {name: model["relation"] for name, model in models.items()})
+    return {
+        "runs": runs,
+        "median_seconds": statistics.median(run["seconds"] for run in runs),
+        "min_seconds": min(run["seconds"] for run in runs),
+        "median_peak_rss_mb": statistics.median(run["peak_rss_mb"] for run in runs),
+        "min_peak_rss_mb": min(run["peak_rss_mb"] for run in runs),
+        "models": {
+            name: {
+                "median_seconds": statistics.median(model["seconds"]),
+                "min_seconds": min(model["seconds"]),
+                "seconds": model["seconds"],
+                "rows": rows[name],
+            }
+            for name, model in sorted(models.items())
+        },
+    }
+
+
+def run_benchmark(scales: List[int], repetitions: int, label: str, select: Optional[List[str]] = None) -> Dict:
+    """Benchmark every scale factor and save the results under `label`."""
+    DbtProject(use_parse_cache=False).install_packages()
+    results = {
+        "label": label,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "dbt_version": dbt_version,
+        "duckdb_version": duckdb.__version__,
+        "repetitions": repetitions,
+        "scales": {},
+    }
+    for scale in scales:
+        print(f"\n⟳ Scale factor {scale}: {repetitions} full-refresh runs")
+        results["scales"][str(scale)] = benchmark_scale(scale, repetitions, select)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"scale_{label}.json"
+    path.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\n✓ Results saved to {path}")
+    return results
+
+
+def print_summary(results: Dict) -> None:
+    for scale, scale_results in results["scales"].items():
+        print(f"\nScale factor {scale}: {scale_results['min_seconds']:.2f}s min, "
+              f"{scale_results['median_seconds']:.2f}s median, peak {scale_results['min_peak_rss_mb']:.0f}MB")
+        print(f"  {'model':<24}{'rows':>14}{'min s':>10}{'median s':>10}")
+        for name, model in scale_results["models"].items():
+            rows = "-" if model["rows"] is None else f"{model['rows']:,}"
+            print(f"  {name:<24}{rows:>14}{model['min_seconds']:>10.3f}{model['median_seconds']:>10.3f}")
+
+
+def _regressed(before: float, after: float, threshold: float, min_delta: float = 0) -> bool:
+    return after > before * (1 + threshold) and after - before > min_delta
+
+
+def check_regressions(results: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Models, runs and peak memory that regressed beyond the threshold against the baseline."""
+    regressions = []
+    for scale, current in results["scales"].items():
+        base = baseline["scales"].get(scale)
+        if base is None:
+            print(f"⚠ Scale factor {scale} not in the baseline, not checked")
+            continue
+
+        checks = [("total", base["min_seconds"], current["min_seconds"], MIN_SECONDS, "s", True)]
+        checks += [
+            (name, base["models"][name]["min_seconds"], model["min_seconds"], MIN_SECONDS, "s",
+             base["models"][name]["min_seconds"] >= GATED_MODEL_SECONDS)
+            for name, model in current["models"].items() if name in base["models"]
+        ]
+        checks.append(("peak memory", base["min_peak_rss_mb"], current["min_peak_rss_mb"], 0, "MB", True))
+
+        print(f"\nScale factor {scale} vs baseline '{baseline['label']}' (fastest runs)")
+        for name, before, after, min_delta, unit, gated in checks:
+            change = (after - before) / before * 100 if before else 0
+            regressed = gated and _regressed(before, after, threshold, min_delta)
+            icon = ("✗" if regressed else "✓") if gated else "-"
+            print(f"  {icon} {name:<24}{before:>10.2f}{unit} → {after:>8.2f}{unit} "
+                  f"({change:+.0f}%){'' if gated else ' not gated'}")
+            if regressed:
+                regressions.append(f"sf{scale} {name}: {before:.2f}{unit} → {after:.2f}{unit} ({change:+.0f}%)")
+    return regressions
+
+
+def main():
+    """Run the scale benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark the dbt models at several scale factors on DuckDB.")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10], help="Scale factors (default: 1 10)")
+    parser.add_argument("--repetitions", type=int, default=3, help="Full-refresh runs per scale factor (default: 3)")
+    parser.add_argument("--label", default="current", help="Save the results as benchmark_results/scale_<label>.json")
+    parser.add_argument("--select", nargs="*", help="Only run these dbt selectors")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if anything regressed")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown as a fraction (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"dbt scale benchmark: scale factors {', '.join(map(str, args.scales))}")
+    print("=" * 60)
+    start = time.perf_counter()
+
+    try:
+        results = run_benchmark(args.scales, args.repetitions, args.label, args.select)
+    except Exception as e:
+        print(f"✗ Benchmark failed: {e}")
+        sys.exit(1)
+    print_summary(results)
+
+    baseline_path = Path(args.baseline)
+    regressions = []
+    if args.check:
+        if not baseline_path.exists():
+            print(f"✗ No baseline at {baseline_path}; record one with --save-baseline")
+            sys.exit(1)
+        baseline = json.loads(baseline_path.read_text())
+        if any("min_seconds" not in scale for scale in baseline["scales"].values()):
+            print(f"✗ Baseline {baseline_path} has no minimum times; record it again with --save-baseline")
+            sys.exit(1)
+        regressions = check_regressions(results, baseline, args.threshold)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\n✓ Baseline saved to {baseline_path}")
+
+    print("=" * 60)
+    if regressions:
+        print(f"✗ {len(regressions)} regressions beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print(f"✓ Benchmark completed in {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Staging materialization strategy for the dvd_rental dbt project.
+Parses the project and recommends a materialization for every staging model from
+its fan-in (the number of models that read it):
+
+    1 consumer                      -> ephemeral
+    2+ consumers                    -> table
+    2+ consumers, feeds incremental -> view
+    no consumers                    -> view
+
+A staging model that (directly or through views/ephemerals) feeds an incremental
+model stays a view: the incremental filter is then pushed down to the source, while
+a table would be rewritten in full on every run.
+
+Usage: python staging_strategy.py [--check]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from dbt.cli.main import dbtRunner
+
+
+PROJECT_DIR = Path(__file__).resolve().parent / "dvd_rental"
+STAGING_PREFIX = "stg_"
+
+# Materializations an incremental filter is pushed down through
+PASS_THROUGH = ("view", "ephemeral")
+
+
+def load_manifest() -> Dict:
+    """Parse the project and return the manifest."""
+    result = dbtRunner().invoke([
+        "parse", "--project-dir", str(PROJECT_DIR), "--profiles-dir", str(PROJECT_DIR), "--quiet",
+    ])
+    if not result.success:
+        raise Exception(f"dbt parse failed: {result.exception}")
+    return json.loads((PROJECT_DIR / "target" / "manifest.json").read_text())
+
+
+def model_children(manifest: Dict, unique_id: str) -> List[str]:
+    return [
+        child for child in manifest["child_map"].get(unique_id, [])
+        if manifest["nodes"].get(child, {}).get("resource_type") == "model"
+    ]
+
+
+def feeds_incremental(manifest: Dict, unique_id: str) -> bool:
+    """True if an incremental model reads this model directly or through views/ephemerals."""
+    pending = model_children(manifest, unique_id)
+    seen = set()
+    while pending:
+        child = pending.pop()
+        if child in seen:
+            continue
+        seen.add(child)
+        materialized = manifest["nodes"][child]["config"]["materialized"]
+        if materialized == "incremental":
+            return True
+        if materialized in PASS_THROUGH:
+            pending.extend(model_children(manifest, child))
+    return False
+
+
+def recommend(manifest: Dict, unique_id: str) -> str:
+    """Materialization for a staging model according to its fan-in."""
+    consumers = len(model_children(manifest, unique_id))
+    if consumers == 0:
+        return "view"
+    if consumers == 1:
+        return "ephemeral"
+    if feeds_incremental(manifest, unique_id):
+        return "view"
+    return "table"
+
+
+def staging_strategy(manifest: Dict) -> List[Dict]:
+    """Current and recommended materialization of every staging model."""
+    rows = []
+    for unique_id, node in sorted(manifest["nodes"].items()):
+        if node["resource_type"] != "model" or not node["name"].startswith(STAGING_PREFIX):
+            continue
+        consumers = model_children(manifest, unique_id)
+        rows.append({
+            "model": node["name"],
+            "consumers": [manifest["nodes"][c]["name"] for c in consumers],
+            "current": node["config"]["materialized"],
+            "recommended": recommend(manifest, unique_id),
+        })
+    return rows
+
+
+def main():
+    """Print the staging strategy; with --check, exit 1 if a model deviates from it."""
+    parser = argparse.ArgumentParser(description="Recommend staging materializations from model fan-in.")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any model deviates")
+    args = parser.parse_args()
+
+    try:
+        rows = staging_strategy(load_manifest())
+    except Exception as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    drift = [row for row in rows if row["current"] != row["recommended"]]
+    for row in rows:
+        mark = "✓" if row["current"] == row["recommended"] else "⚠"
+        consumers = ", ".join(row["consumers"]) or "-"
+        print(f"{mark} {row['model']:<20} {row['current']:<10} → {row['recommended']:<10} "
+              f"({len(row['consumers'])} consumers: {consumers})")
+
+    if drift:
+        print(f"⚠ {len(drift)} staging models deviate; update staging: in dbt_project.yml")
+        if args.check:
+            sys.exit(1)
+    else:
+        print(f"✓ All {len(rows)} staging models follow the fan-in strategy")
+
+
+if __name__ == "__main__":
+    main()
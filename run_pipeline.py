@@ -0,0 +1,180 @@
+"""
+Run the whole ELT pipeline from one process: (optionally) set up Airbyte, trigger
+the syncs, wait for their jobs, then build the dbt project in-process.
+
+Per-stream results of the sync jobs tell which source tables received records;
+dbt then builds only the models downstream of those tables, plus models whose code
+changed since the last successful build (state:modified+). If a job reports no
+per-stream results, source freshness decides instead (source_status:fresher+).
+
+Usage: python run_pipeline.py [connection ...] [--all] [--setup] [--skip-sync] [--full-build] [--quality-scan]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT / "data_ingestion"))
+sys.path.insert(0, str(ROOT / "data_transformation"))
+
+import requests
+
+import run_dbt
+import setup_airbyte
+from job_waiter import exit_code_for, print_job_summary, wait_for_job
+from resource_index import ResourceIndex
+from run_dbt import DbtProject
+from setup_airbyte import AirbyteClient
+from trigger_sync import select_connections, start_sync
+
+
+# dbt source that the Airbyte streams land in
+DBT_SOURCE = "dvd_rental"
+
+
+def sync_connection(client: AirbyteClient, connection: Dict, args: argparse.Namespace) -> Dict:
+    """Trigger one connection, wait for its job and collect per-stream results."""
+    label = connection.get("name", connection["connectionId"])
+    outcome = {"connection": label, "job_id": None, "exit_code": 1, "stream_stats": []}
+    try:
+        job_id = start_sync(client, connection)
+        if not job_id:
+            # A sync was already running but could not be found; its changes are unknown
+            outcome["exit_code"] = 0
+            return outcome
+        outcome["job_id"] = job_id
+        job = wait_for_job(
+            client, job_id,
+            timeout=args.timeout,
+            initial_interval=args.poll_interval,
+            max_interval=args.max_poll_interval,
+            label=label
+        )
+        outcome["stream_stats"] = client.get_job_stream_stats(job_id)
+        print_job_summary(client, job_id, job, label=label, stream_stats=outcome["stream_stats"])
+        outcome["exit_code"] = exit_code_for(job)
+    except requests.exceptions.RequestException as e:
+        print(f"[{label}] ✗ Error: {e}")
+    return outcome
+
+
+def run_syncs(args: argparse.Namespace) -> List[Dict]:
+    """Sync the selected connections in parallel; returns one outcome per connection."""
+    client = AirbyteClient(
+        os.getenv("AIRBYTE_URL", "http://localhost:8000/api"),
+        client_id=os.getenv("AIRBYTE_CLIENT_ID"),
+        client_secret=os.getenv("AIRBYTE_CLIENT_SECRET")
+    )
+    client.authenticate()
+    if not client.workspace_id:
+        client.get_workspace()
+
+    connections = ResourceIndex.build(client, "connections")
+    if not connections:
+        raise Exception("No connections found in workspace")
+    selected = select_connections(client, args.connections, args.all, connections)
+
+    print(f"\n🔄 Syncing {len(selected)} connection(s)...")
+    with ThreadPoolExecutor(max_workers=max(args.max_in_flight, 1)) as pool:
+        return list(pool.map(lambda conn: sync_connection(client, conn, args), selected))
+
+
+def changed_tables(outcomes: List[Dict]) -> Optional[Set[str]]:
+    """
+    Streams that emitted records in any of the jobs, or None if a job did not
+    report per-stream results (so the changes are unknown).
+    """
+    tables = set()
+    for outcome in outcomes:
+        if not outcome["stream_stats"]:
+            return None
+        tables.update(s["stream"] for s in outcome["stream_stats"] if s["records"])
+    return tables
+
+
+def dbt_selection(tables: Optional[Set[str]], project: DbtProject) -> List[str]:
+    """dbt selectors for the models affected by the changed tables."""
+    if tables is None:
+        print("⚠ No per-stream sync results; selecting models by source freshness")
+        return run_dbt.CHANGED_SELECTOR
+
+    known = {source.name for source in project.parse().sources.values() if source.source_name == DBT_SOURCE}
+    ignored = sorted(tables - known)
+    if ignored:
+        print(f"  Streams without a dbt source (ignored): {', '.join(ignored)}")
+    changed = sorted(tables & known)
+    print(f"✓ {len(changed)} source tables changed: {', '.join(changed) or 'none'}")
+    return [f"source:{DBT_SOURCE}.{table}+" for table in changed] + ["state:modified+"]
+
+
+def main():
+    """Run setup, sync and dbt build."""
+    parser = argparse.ArgumentParser(description="Sync Airbyte connections and build the affected dbt models.")
+    parser.add_argument("connections", nargs="*", metavar="connection",
+                        help="Connection names, IDs or glob patterns (default: first active connection)")
+    parser.add_argument("--all", action="store_true", help="Sync every active connection")
+    parser.add_argument("--setup", action="store_true", help="Create or reuse the Airbyte resources first")
+    parser.add_argument("--skip-sync", action="store_true",
+                        help="Do not sync; build the models downstream of sources fresher than the last build")
+    parser.add_argument("--full-build", action="store_true", help="Build every model regardless of what changed")
+    parser.add_argument("--full-refresh", action="store_true", help="Rebuild incremental models from scratch")
+    parser.add_argument("--docs", action="store_true", help="Generate dbt docs after the build")
+    parser.add_argument("--quality-scan", action="store_true",
+                        help="Check column/row tests in one query per relation instead of one query per test")
+    parser.add_argument("--state-dir", default=str(run_dbt.DEFAULT_STATE_DIR),
+                        help="Artifacts of the last successful dbt build")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Connections synced concurrently (default: 8)")
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds to wait for each job (default: 3600)")
+    parser.add_argument("--poll-interval", type=float, default=5, help="Initial seconds between polls (default: 5)")
+    parser.add_argument("--max-poll-interval", type=float, default=60, help="Maximum seconds between polls (default: 60)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ELT Pipeline: Airbyte → Databricks → dbt")
+    print("=" * 60)
+    start = time.perf_counter()
+    project = DbtProject()
+
+    try:
+        if args.setup:
+            setup_airbyte.main([])
+
+        if args.skip_sync:
+            select = None if args.full_build else run_dbt.CHANGED_SELECTOR
+        else:
+            outcomes = run_syncs(args)
+            exit_code = max(outcome["exit_code"] for outcome in outcomes)
+            if exit_code:
+                failed = [o["connection"] for o in outcomes if o["exit_code"]]
+                print(f"✗ Sync failed for: {', '.join(failed)}; skipping dbt")
+                sys.exit(exit_code)
+            select = None if args.full_build else dbt_selection(changed_tables(outcomes), project)
+
+        print("\n" + "=" * 60)
+        print("dbt build")
+        print("=" * 60)
+        success = run_dbt.run(
+            state_dir=Path(args.state_dir),
+            full_refresh=args.full_refresh,
+            select=select,
+            project=project,
+            docs=args.docs,
+            quality_scan=args.quality_scan
+        )
+
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"{'✓ Pipeline completed' if success else '✗ Pipeline failed'} in {time.perf_counter() - start:.0f}s")
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()